@@ -1,4 +1,5 @@
-import queue
+import time
+from collections import deque
 
 import pygame as pg
 
@@ -11,7 +12,6 @@ from data.components.player.states.move_left import MoveLeft
 from data.components.player.states.move_right import MoveRight
 from data.components.player.states.move_middle import MoveMiddle
 from data.components.player.states.take_damage import TakeDamage
-import threading
 
 
 class Player(pg.sprite.Sprite):
@@ -19,11 +19,8 @@ class Player(pg.sprite.Sprite):
         super().__init__(*groups)
 
         self.current_gesture = None
-        self.gesture_lock = threading.Lock()
+        self.pending_gestures = deque()  # Gesture events waiting for the next update, none are dropped
         self.hand_detected = False  # Store detection result
-        self.detecting = True  # Control detection thread
-        self.detection_thread = threading.Thread(target=self.run_hand_detection, daemon=True)
-        self.detection_thread.start()
 
         self.state_machine = PlayerStateMachine(self)
         self.initial_health = 3  # Set the initial health value
@@ -47,8 +44,7 @@ class Player(pg.sprite.Sprite):
 
     def update(self, now, keys, enemy):
         """Update player logic."""
-        with self.gesture_lock:
-            self.process_current_gesture()
+        self.process_current_gesture()
         self.state_machine.update(self)
 
     def reset(self):
@@ -58,6 +54,7 @@ class Player(pg.sprite.Sprite):
         self.is_hurt = False
         self.is_attacking = False
         self.player_pos = 1
+        self.pending_gestures.clear()
 
     def take_damage(self, damage):
         """Handle player taking damage."""
@@ -66,18 +63,19 @@ class Player(pg.sprite.Sprite):
         self.state_machine.change_state(TakeDamage(damage))
 
     def process_current_gesture(self):
-        """Process the latest gesture detected by the hand detection thread."""
-        if self.current_gesture:
+        """Process every gesture queued since the last update, oldest first."""
+        while self.pending_gestures:
+            event = self.pending_gestures.popleft()
+            hand_detection.latency_stats.record_event(event, time.monotonic())
+            self.current_gesture = event.gesture
             self.handle_movement(self.current_gesture)
             self.handle_attack(self.current_gesture)
-            self.current_gesture = None
-
-    def run_hand_detection(self):
-        while self.detecting:
-            detected_gesture = hand_detection.get_detected_gesture()
-            if detected_gesture:
-                with self.gesture_lock:
-                    self.current_gesture = detected_gesture
+        self.current_gesture = None
+
+    def get_event(self, event):
+        """Queue gestures posted by the hand detector."""
+        if event.type == hand_detection.GESTURE:
+            self.pending_gestures.append(event)
 
     def handle_movement(self, gesture):
         """Move player directly in response to detected gesture."""
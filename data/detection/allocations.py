@@ -0,0 +1,74 @@
+"""
+Allocation churn of the detection pipeline.
+Reads frames from a source into a fixed buffer and runs them through the
+pipeline under tracemalloc, reporting how much memory each frame allocates
+on top of what was already live. With the buffers warmed up this should be
+close to nothing but the LandmarkFrame of each frame.
+
+    python -m data.detection.allocations --frames 300
+    python -m data.detection.allocations --source video:clip.mp4 --roi
+"""
+
+import argparse
+import sys
+import tracemalloc
+
+import numpy as np
+
+from .backends import create_backend
+from .frame_source import SyntheticSource, open_source
+from .pipeline import DetectionPipeline
+
+
+def allocations_per_frame(step, frames=200, warmup=20):
+    """
+    Call step() warmup times, then frames times under tracemalloc.
+    Returns the mean and the largest number of bytes a call allocated
+    above what was live before it.
+    """
+    for _ in range(warmup):
+        step()
+    allocated = np.zeros(frames)
+    tracemalloc.start()
+    try:
+        for n in range(frames):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            step()
+            _, peak = tracemalloc.get_traced_memory()
+            allocated[n] = peak - before
+    finally:
+        tracemalloc.stop()
+    return float(allocated.mean()), float(allocated.max())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure per-frame allocations of the detection pipeline.")
+    parser.add_argument("--source", help="frame source spec, synthetic by default")
+    parser.add_argument("--frames", type=int, default=200, help="frames to measure")
+    parser.add_argument("--backend", help="hand backend spec, see detection.backends")
+    parser.add_argument("--roi", action="store_true", help="crop to the hands' region of interest")
+    args = parser.parse_args(argv)
+
+    source = open_source(args.source) if args.source else SyntheticSource(realtime=False)
+    pipeline = DetectionPipeline(create_backend(args.backend), roi=args.roi)
+    success, frame = source.read()
+    if not success:
+        print("Could not read a frame from the source")
+        return 1
+
+    def step():
+        source.read(frame)
+        pipeline.process(frame)
+
+    try:
+        mean, largest = allocations_per_frame(step, args.frames)
+    finally:
+        source.release()
+        pipeline.hands.close()
+    print(f"{args.frames} frames: {mean / 1024:.1f} KiB allocated per frame on average, {largest / 1024:.1f} KiB at most")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+Hand landmark backends for the detection pipeline.
+A backend takes an image and returns a LandmarkFrame:
+    legacy      mp.solutions.hands.Hands, synchronous, the original backend
+    tasks       the MediaPipe Tasks HandLandmarker in LIVE_STREAM mode
+    opencv      colour segmentation of skin or gloves, no MediaPipe at all,
+                for machines that can't keep up with it
+
+All of them implement HandBackend.
+
+Backends are picked with a spec string, usually from the
+REBOX_HAND_BACKEND environment variable:
+    legacy              model complexity 1
+    legacy:0            the lighter model
+    tasks               assets/models/hand_landmarker.task, also tasks:full
+    tasks:other.task    any other model bundle you supply
+    opencv              skin coloured blobs
+    opencv:red          red gloves, also blue and green
+"""
+
+import collections
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from .landmarks import NUM_LANDMARKS, LandmarkFrame
+
+DEFAULT_BACKEND = "legacy"
+MODEL_DIRECTORY = os.path.join("assets", "models")
+# MediaPipe publishes a single HandLandmarker bundle, legacy:0 is the lighter option
+TASK_MODELS = {
+    "full": "hand_landmarker.task",
+}
+
+
+class HandBackend:
+    """
+    What the pipeline expects of a backend. color_order ("RGB" or "BGR")
+    is the layout of the images it wants. detect() returns the LandmarkFrame
+    of the newest finished inference, stamped with the capture time of its
+    frame, or None when nothing finished since the last call: asynchronous
+    backends hand in frames and collect results later, so capture keeps
+    going while inference is in flight. inferred_at is the monotonic time
+    the last returned inference finished.
+    """
+    color_order = "RGB"
+
+    def __init__(self):
+        self.inferred_at = None
+
+    def detect(self, image, captured_at):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class LegacyHands(HandBackend):
+    """The legacy MediaPipe Hands solution, run synchronously."""
+
+    def __init__(self, max_num_hands=2, model_complexity=1, min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5):
+        import mediapipe as mp
+
+        HandBackend.__init__(self)
+        self.hands = mp.solutions.hands.Hands(
+            static_image_mode=False, max_num_hands=max_num_hands, model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence, min_tracking_confidence=min_tracking_confidence)
+
+    def detect(self, image, captured_at):
+        results = self.hands.process(image)
+        self.inferred_at = time.monotonic()
+        return LandmarkFrame.from_results(results, captured_at)
+
+    def close(self):
+        self.hands.close()
+
+
+class TasksHandLandmarker(HandBackend):
+    """
+    The MediaPipe Tasks HandLandmarker in LIVE_STREAM mode. Frames are
+    submitted with detect_async() and results arrive on MediaPipe's own
+    thread; MediaPipe drops frames that come in while it is still busy.
+    """
+    def __init__(self, model="full", num_hands=2, min_detection_confidence=0.5,
+                 min_presence_confidence=0.5, min_tracking_confidence=0.5):
+        import mediapipe as mp
+        from mediapipe.tasks.python import BaseOptions, vision
+
+        HandBackend.__init__(self)
+        self.mp = mp
+        self.model_path = model_path(model)
+        options = vision.HandLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=self.model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_presence_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self.on_result)
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+        self.lock = threading.Lock()
+        self.last_timestamp_ms = -1
+        # Capture time of every frame in flight, by its millisecond timestamp
+        self.in_flight = collections.OrderedDict()
+        self.latest = None
+
+    def detect(self, image, captured_at):
+        # Tasks wants strictly increasing millisecond timestamps
+        timestamp_ms = max(int(captured_at * 1000), self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+        with self.lock:
+            self.in_flight[timestamp_ms] = captured_at
+            while len(self.in_flight) > 32:
+                self.in_flight.popitem(last=False)
+        # mp.Image copies the pixels, the pipeline may reuse its buffer right away
+        mp_image = self.mp.Image(image_format=self.mp.ImageFormat.SRGB, data=image)
+        self.landmarker.detect_async(mp_image, timestamp_ms)
+
+        with self.lock:
+            latest, self.latest = self.latest, None
+        if latest is None:
+            return None
+        landmarks, self.inferred_at = latest
+        return landmarks
+
+    def on_result(self, result, image, timestamp_ms):
+        inferred_at = time.monotonic()
+        with self.lock:
+            captured_at = self.in_flight.pop(timestamp_ms, timestamp_ms / 1000)
+            # Frames MediaPipe skipped will never come back
+            while self.in_flight and next(iter(self.in_flight)) < timestamp_ms:
+                self.in_flight.popitem(last=False)
+            self.latest = LandmarkFrame.from_task_result(result, captured_at), inferred_at
+
+    def close(self):
+        self.landmarker.close()
+
+
+# Lower and upper bounds of every colour preset, in the colour space named first.
+# Red wraps around the end of the hue range, so it needs two.
+COLOR_PRESETS = {
+    "skin": ("ycrcb", [((0, 133, 77), (255, 173, 127))]),
+    "red": ("hsv", [((0, 120, 70), (10, 255, 255)), ((170, 120, 70), (180, 255, 255))]),
+    "blue": ("hsv", [((100, 120, 50), (130, 255, 255))]),
+    "green": ("hsv", [((40, 80, 50), (85, 255, 255))]),
+}
+FACE_CASCADE = "haarcascade_frontalface_default.xml"
+
+
+class ColorSegmentation(HandBackend):
+    """
+    Pure OpenCV hands: the two largest blobs of skin or glove colour. There
+    are no real landmarks, every hand gets its blob's bounding box corners
+    and centroid, which is all the classifier looks at: centroid for the
+    column, box area growth for punches. The blob further left in the image
+    gets the label MediaPipe would give a hand there.
+
+    Work happens on a work_size image in preallocated buffers. Blobs smaller
+    than min_area of it are ignored. With skin colour the face is masked
+    out when OpenCV ships its face cascade, look_for_face_every frames.
+    """
+    color_order = "BGR"
+
+    def __init__(self, preset="skin", max_hands=2, work_size=(160, 120), min_area=0.005, look_for_face_every=10):
+        HandBackend.__init__(self)
+        self.max_hands = max_hands
+        if preset not in COLOR_PRESETS:
+            raise ValueError(f"Unknown colour preset {preset!r}, pick one of {', '.join(COLOR_PRESETS)}")
+        space, ranges = COLOR_PRESETS[preset]
+        self.conversion = cv2.COLOR_BGR2YCrCb if space == "ycrcb" else cv2.COLOR_BGR2HSV
+        self.ranges = [(np.array(low, dtype=np.uint8), np.array(high, dtype=np.uint8)) for low, high in ranges]
+        self.work_size = work_size
+        w, h = work_size
+        self.min_area = min_area * w * h
+        self.small = np.empty((h, w, 3), dtype=np.uint8)
+        self.converted = np.empty((h, w, 3), dtype=np.uint8)
+        self.mask = np.empty((h, w), dtype=np.uint8)
+        self.range_mask = np.empty((h, w), dtype=np.uint8)
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+
+        self.faces = None
+        self.face_box = None
+        self.look_for_face_every = look_for_face_every
+        self.frame_count = 0
+        cascade = os.path.join(getattr(getattr(cv2, "data", None), "haarcascades", ""), FACE_CASCADE)
+        if preset == "skin" and os.path.exists(cascade):
+            self.faces = cv2.CascadeClassifier(cascade)
+            self.gray = np.empty((h, w), dtype=np.uint8)
+
+    def detect(self, image, captured_at):
+        w, h = self.work_size
+        cv2.resize(image, self.work_size, dst=self.small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.small, self.conversion, dst=self.converted)
+        cv2.inRange(self.converted, *self.ranges[0], dst=self.mask)
+        for low, high in self.ranges[1:]:
+            cv2.inRange(self.converted, low, high, dst=self.range_mask)
+            cv2.bitwise_or(self.mask, self.range_mask, dst=self.mask)
+        self.mask_face()
+        cv2.morphologyEx(self.mask, cv2.MORPH_OPEN, self.kernel, dst=self.mask)
+        cv2.morphologyEx(self.mask, cv2.MORPH_CLOSE, self.kernel, dst=self.mask)
+
+        contours, _ = cv2.findContours(self.mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        blobs = sorted((c for c in contours if cv2.contourArea(c) >= self.min_area), key=cv2.contourArea)[-self.max_hands:]
+        points = np.zeros((len(blobs), NUM_LANDMARKS, 3), dtype=np.float32)
+        for points_of_hand, contour in zip(points, blobs):
+            x, y, bw, bh = cv2.boundingRect(contour)
+            moments = cv2.moments(contour)
+            points_of_hand[:, 0] = moments["m10"] / moments["m00"] / w
+            points_of_hand[:, 1] = moments["m01"] / moments["m00"] / h
+            points_of_hand[0, :2] = x / w, y / h
+            points_of_hand[1, :2] = (x + bw) / w, (y + bh) / h
+        self.inferred_at = time.monotonic()
+
+        # Left to right in the image
+        points = points[np.argsort(points[:, 2, 0])]
+        if len(points) == 2:
+            hand_index = np.array([0, 1], dtype=np.intp)
+        else:
+            hand_index = (points[:, 2, 0] >= 0.5).astype(np.intp)
+        return LandmarkFrame(points, hand_index, captured_at)
+
+    def mask_face(self):
+        """Black out the face in the mask, it is the same colour as the hands."""
+        if self.faces is None:
+            return
+        if self.frame_count % self.look_for_face_every == 0:
+            cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=self.gray)
+            faces = self.faces.detectMultiScale(self.gray, scaleFactor=1.2, minNeighbors=3)
+            self.face_box = max(faces, key=lambda f: f[2] * f[3]) if len(faces) else None
+        self.frame_count += 1
+        if self.face_box is not None:
+            x, y, fw, fh = self.face_box
+            # The neck is skin too
+            self.mask[max(0, y - fh // 4):y + fh * 3 // 2, max(0, x - fw // 4):x + fw * 5 // 4] = 0
+
+
+def model_path(model):
+    """Path of a Tasks model bundle, given a name from TASK_MODELS or a path."""
+    path = os.path.join(MODEL_DIRECTORY, TASK_MODELS[model]) if model in TASK_MODELS else model
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"HandLandmarker model {path} not found, download it from "
+                                "https://developers.google.com/mediapipe/solutions/vision/hand_landmarker")
+    return path
+
+
+def create_backend(spec=None, num_hands=2, min_detection_confidence=0.5):
+    """Build the backend described by spec, see the module docstring."""
+    kind, _, argument = (spec or DEFAULT_BACKEND).partition(":")
+    if kind == "legacy":
+        return LegacyHands(num_hands, int(argument or 1), min_detection_confidence)
+    elif kind == "tasks":
+        return TasksHandLandmarker(argument or "full", num_hands, min_detection_confidence)
+    elif kind == "opencv":
+        return ColorSegmentation(argument or "skin", num_hands)
+    raise ValueError(f"Unknown hand backend {spec!r}")
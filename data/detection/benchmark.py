@@ -0,0 +1,214 @@
+"""
+Headless throughput benchmark of the detection pipeline.
+Feeds frames from a synthetic or recorded source, never a camera or a
+window, through capture, resize, colour conversion, MediaPipe inference,
+landmark extraction and classification as fast as they go. Every
+combination of input size and model setting is one run; frames per second
+and the time of every stage end up in a JSON file.
+
+    python -m data.detection.benchmark --output bench.json
+    python -m data.detection.benchmark --source video:clip.mp4 --sizes 320x240,640x480 --backends legacy:0,tasks
+    python -m data.detection.benchmark --compare bench.json --tolerance 0.2
+
+Synthetic frames have no hands in them, so use a recorded video to time
+the landmark and classification stages under real load. Asynchronous
+backends take frames faster than they finish them, for those "results_per_s"
+is the rate that matters.
+
+With --live the source delivers frames at its own frame rate through a
+FrameGrabber, as a camera does in the game, and "dropped" counts the frames
+the ring overwrote before the pipeline got to them. Otherwise every frame
+is read on demand and none can be dropped.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from .backends import create_backend
+from .capture import FrameGrabber
+from .frame_source import SyntheticSource, open_source
+from .pipeline import STAGES, DetectionPipeline
+
+
+def parse_sizes(text):
+    return [tuple(int(n) for n in size.split("x")) for size in text.split(",")]
+
+
+def parse_ints(text):
+    return [int(n) for n in text.split(",")]
+
+
+def parse_list(text):
+    return text.split(",")
+
+
+def environment():
+    """Versions and machine the numbers were taken on."""
+    try:
+        import mediapipe
+        mediapipe_version = mediapipe.__version__
+    except ImportError:
+        mediapipe_version = None
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "mediapipe": mediapipe_version,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def open_benchmark_source(spec, live=False):
+    """Open spec, unpaced so frames come as fast as they can be read unless live."""
+    if not spec or spec == "synthetic":
+        return SyntheticSource(realtime=live)
+    source = open_source(spec)
+    if hasattr(source, "realtime"):
+        source.realtime = live
+    return source
+
+
+def run(spec, input_size, backend, num_hands, roi, motion_gate, frames, warmup, live=False):
+    """Time one configuration. Returns its entry for the JSON report."""
+    source = open_benchmark_source(spec, live)
+    grabber = FrameGrabber(source) if live else None
+    pipeline = DetectionPipeline(create_backend(backend, num_hands), roi=roi, motion_gate=motion_gate)
+    pipeline.input_size = input_size
+    times = np.zeros((frames, len(STAGES) + 1))  # Capture, then the pipeline's stages
+    frame = None
+    gestures = 0
+    results = 0
+    skipped_before = 0
+    dropped_before = 0
+    if grabber is not None:
+        grabber.start()
+    try:
+        for n in range(-warmup, frames):
+            started_at = time.monotonic()
+            if grabber is not None:
+                frame, captured_at = grabber.latest(timeout=5)
+                success = frame is not None
+            else:
+                success, frame = source.read(frame)
+                captured_at = time.monotonic()
+            if not success:
+                raise IOError(f"Frame source {spec!r} ran out of frames")
+            read_at = time.monotonic()
+            if n == -1 and grabber is not None:
+                dropped_before = grabber.dropped
+            previous = pipeline.landmarks
+            skipped = pipeline.motion_gate.skipped if motion_gate else 0
+            found = pipeline.process(frame, captured_at)
+            if n == -1 and motion_gate:
+                skipped_before = pipeline.motion_gate.skipped
+            if n >= 0:
+                # A frame the motion gate skipped gets a new LandmarkFrame too, but no inference
+                gated = motion_gate and pipeline.motion_gate.skipped != skipped
+                results += pipeline.landmarks is not previous and not gated
+                times[n, 0] = read_at - started_at
+                times[n, 1:] = pipeline.stage_times
+                gestures += len(found)
+    finally:
+        if grabber is not None:
+            grabber.stop()
+        source.release()
+        pipeline.hands.close()
+
+    total = times.sum()
+    stages_ms = {}
+    for name, column in zip(("capture",) + STAGES, times.T * 1000):
+        p50, p95 = np.percentile(column, (50, 95))
+        stages_ms[name] = {"mean": float(column.mean()), "p50": float(p50), "p95": float(p95)}
+    return {
+        "input_size": list(input_size),
+        "backend": backend,
+        "num_hands": num_hands,
+        "roi": roi,
+        "motion_gate": motion_gate,
+        "frames": frames,
+        "skipped": pipeline.motion_gate.skipped - skipped_before if motion_gate else 0,
+        "live": live,
+        "dropped": grabber.dropped - dropped_before if live else 0,
+        "frame_size": [frame.shape[1], frame.shape[0]],
+        "fps": float(frames / total),
+        "results_per_s": float(results / total),
+        "gestures": gestures,
+        "stages_ms": stages_ms,
+    }
+
+
+def run_key(result):
+    return (tuple(result["input_size"]), result["backend"], result["num_hands"], result["roi"],
+            result.get("motion_gate", False))
+
+
+def compare(results, baseline, tolerance):
+    """Print every run slower than its baseline by more than tolerance. Returns the number of regressions."""
+    previous = {run_key(result): result for result in baseline["runs"]}
+    regressions = 0
+    for result in results:
+        old = previous.get(run_key(result))
+        if old is None:
+            continue
+        if result["results_per_s"] < old["results_per_s"] * (1 - tolerance):
+            regressions += 1
+            print(f"Regression {run_key(result)}: {result['results_per_s']:.1f} results/s, "
+                  f"was {old['results_per_s']:.1f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the detection pipeline without a camera or display.")
+    parser.add_argument("--source", default="synthetic", help="frame source spec, see detection.frame_source")
+    parser.add_argument("--sizes", type=parse_sizes, default=[(320, 240), (640, 480)],
+                        help="input sizes handed to MediaPipe, e.g. 320x240,640x480")
+    parser.add_argument("--backends", type=parse_list, default=["legacy:0", "legacy:1"],
+                        help="hand backend specs, see detection.backends")
+    parser.add_argument("--hands", type=parse_ints, default=[2], help="maximum numbers of hands to look for")
+    parser.add_argument("--roi", action="store_true", help="also run every setting with the region of interest")
+    parser.add_argument("--motion-gate", action="store_true", help="also run every setting with the motion gate")
+    parser.add_argument("--live", action="store_true",
+                        help="pace the source at its frame rate through a FrameGrabber and count dropped frames")
+    parser.add_argument("--frames", type=int, default=200, help="timed frames per run")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed frames before each run")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="fail if a run is slower than in this earlier JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown for --compare")
+    args = parser.parse_args(argv)
+
+    results = []
+    rois = (False, True) if args.roi else (False,)
+    gates = (False, True) if args.motion_gate else (False,)
+    for size, backend, hands, roi, gate in itertools.product(args.sizes, args.backends, args.hands, rois, gates):
+        result = run(args.source, size, backend, hands, roi, gate, args.frames, args.warmup, args.live)
+        results.append(result)
+        stages = ", ".join(f"{name} {stage['mean']:.2f}" for name, stage in result["stages_ms"].items())
+        print(f"{size[0]}x{size[1]} {backend} hands={hands} roi={roi} motion_gate={gate}: "
+              f"{result['fps']:.1f} frames/s, {result['results_per_s']:.1f} results/s, "
+              f"{result['skipped']} skipped, {result['dropped']} dropped ({stages} ms)")
+
+    report = {"source": args.source, "environment": environment(), "runs": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            if compare(results, json.load(f), args.tolerance):
+                return 1
+        print(f"No run slower than {args.compare} by more than {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
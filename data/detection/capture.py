@@ -0,0 +1,205 @@
+"""
+Camera capture stage for the hand detector.
+A FrameGrabber keeps reading the camera on its own thread so inference
+never waits on cap.read(), and always hands out the newest frame. A
+CaptureSupervisor watches its reads and gets an unplugged or busy camera
+back without spinning.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+# Health of the frame source, as reported by CaptureSupervisor
+HEALTH_OK = "ok"
+HEALTH_FAILING = "failing"  # Reads are failing, retrying shortly
+HEALTH_LOST = "lost"  # Gave up on the source, reopening it with backoff
+HEALTH_STATES = (HEALTH_OK, HEALTH_FAILING, HEALTH_LOST)
+
+
+class CaptureSupervisor:
+    """
+    Decides how long to wait after a failed read and when to reopen the
+    source. Up to max_failures reads in a row may fail with retry_delay in
+    between; after that the source counts as lost and is reopened, first
+    after initial_delay and then twice as long after every attempt that
+    didn't bring frames back, up to max_delay. on_health is called with the
+    new health whenever it changes. A camera drops the odd frame, so the
+    source only counts as failing from failing_after failed reads in a row.
+    """
+    def __init__(self, max_failures=10, retry_delay=0.02, initial_delay=0.25, max_delay=8.0, failing_after=3,
+                 on_health=None):
+        self.max_failures = max_failures
+        self.failing_after = failing_after
+        self.retry_delay = retry_delay
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.on_health = on_health
+        self.health = HEALTH_OK
+        self.failures = 0  # Failed reads in a row
+        self.delay = initial_delay  # Wait before the next reopen
+
+    def succeeded(self):
+        """Record a good read."""
+        if self.failures:
+            self.failures = 0
+            self.delay = self.initial_delay
+        self.set_health(HEALTH_OK)
+
+    def failed(self):
+        """Record a failed read. Returns how long to wait and whether to reopen the source afterwards."""
+        self.failures += 1
+        if self.failures < self.max_failures:
+            if self.failures >= self.failing_after:
+                self.set_health(HEALTH_FAILING)
+            return self.retry_delay, False
+        self.set_health(HEALTH_LOST)
+        delay = self.delay
+        self.delay = min(self.delay * 2, self.max_delay)
+        return delay, True
+
+    def set_health(self, health):
+        if health == self.health:
+            return
+        self.health = health
+        if self.on_health is not None:
+            self.on_health(health)
+
+
+class FrameGrabber:
+    """
+    Drains a cv2.VideoCapture into a small ring buffer of preallocated frames.
+    Frames are read straight into a free slot, so once the ring exists
+    capturing allocates nothing. Every frame is stamped with the monotonic
+    time it was read at. The reader always gets the newest frame, frames it
+    never saw are counted as dropped.
+
+    Failed reads go through supervisor. When it gives up on the source it is
+    released and reopen() is called for a new one, release() lets go of
+    whichever the grabber ends up with.
+    """
+    def __init__(self, capture, size=3, reopen=None, supervisor=None):
+        if size < 3:
+            raise ValueError("FrameGrabber needs at least 3 slots")
+        self.capture = capture
+        self.reopen = reopen
+        self.supervisor = supervisor if supervisor is not None else CaptureSupervisor()
+        self.size = size
+        self.frames = None  # Allocated once the first frame tells us the shape
+        self.slots = []  # A view of every frame in the ring
+        self.timestamps = np.zeros(size)
+        self.sequence = 0  # Number of frames written so far
+        self.newest = -1  # Slot holding the newest frame
+        self.reading = -1  # Slot currently lent out to the reader
+        self.last_sequence = 0  # Sequence number of the last frame handed out
+        self.dropped = 0  # Frames overwritten before anybody read them
+        self.lock = threading.Lock()
+        self.new_frame = threading.Condition(self.lock)
+        self.running = False
+        self.stopped = threading.Event()  # Cuts backoff waits short on stop()
+        self.thread = None
+
+    def start(self):
+        """Start reading the camera in a daemon thread."""
+        if self.running:
+            return
+        self.running = True
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the capture thread and wake up anybody waiting for a frame."""
+        self.running = False
+        self.stopped.set()
+        with self.new_frame:
+            self.new_frame.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1)
+        self.thread = None
+
+    def run(self):
+        while self.running:
+            with self.lock:
+                slot = self.free_slot() if self.frames is not None else None
+            out = self.slots[slot] if slot is not None else None
+            success, frame = self.capture.read(out) if self.capture is not None else (False, None)
+            if not success:
+                self.recover()
+                continue
+            self.supervisor.succeeded()
+            if frame is out:
+                self.publish(slot, time.monotonic())
+            else:
+                # First frame, or the frame size changed
+                self.store(frame, time.monotonic())
+
+    def recover(self):
+        """Back off after a failed read, and reopen the source once the supervisor gives up on it."""
+        delay, reopen = self.supervisor.failed()
+        self.stopped.wait(delay)
+        if not reopen or self.reopen is None or not self.running:
+            return
+        self.release()
+        try:
+            capture = self.reopen()
+        except (IOError, OSError) as e:
+            print(f"Could not reopen the frame source: {e}")
+            return
+        if self.running:
+            self.capture = capture
+        else:
+            capture.release()
+
+    def release(self):
+        """Release the frame source the grabber is reading, call after stop()."""
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+    def free_slot(self):
+        """A slot that is neither the newest frame nor the one the reader holds. Call with the lock held."""
+        slot = (self.newest + 1) % self.size
+        if slot == self.reading:
+            slot = (slot + 1) % self.size
+        return slot
+
+    def store(self, frame, timestamp):
+        """Copy a frame into the next free slot and publish it as the newest."""
+        with self.lock:
+            if self.frames is None or self.frames.shape[1:] != frame.shape:
+                self.frames = np.empty((self.size,) + frame.shape, dtype=frame.dtype)
+                self.slots = list(self.frames)
+                self.newest = -1
+                self.reading = -1
+            slot = self.free_slot()
+
+        np.copyto(self.slots[slot], frame)
+        self.publish(slot, timestamp)
+
+    def publish(self, slot, timestamp):
+        """Make the frame in slot the newest one."""
+        with self.new_frame:
+            self.timestamps[slot] = timestamp
+            self.newest = slot
+            self.sequence += 1
+            self.new_frame.notify()
+
+    def latest(self, timeout=None):
+        """
+        Wait for a frame newer than the last one returned.
+        Returns (frame, timestamp), or (None, None) on timeout or stop.
+        The frame is only valid until the next call to latest().
+        """
+        with self.new_frame:
+            if not self.new_frame.wait_for(
+                    lambda: self.sequence > self.last_sequence or not self.running, timeout):
+                return None, None
+            if self.sequence == self.last_sequence:
+                return None, None
+
+            self.dropped += self.sequence - self.last_sequence - 1
+            self.last_sequence = self.sequence
+            self.reading = self.newest
+            return self.slots[self.reading], float(self.timestamps[self.reading])
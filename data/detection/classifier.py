@@ -0,0 +1,120 @@
+"""
+Gesture classification for the hand detector.
+Turns MediaPipe hand landmarks into column moves and punches.
+"""
+
+import numpy as np
+
+from .columns import ColumnTracker
+from .history import HandHistory
+from .landmarks import COLUMN_NAMES, box_areas, box_centers
+from .punches import PUNCH_GESTURES, make_punch_detector
+from .smoothing import make_smoother
+
+DEFAULT_COOLDOWN = 1.0  # Seconds between two punches of the same hand
+
+
+class GestureClassifier:
+    """
+    Smooths the hand boxes between frames and detects column changes and
+    punches from them. Keeps all of its tracking state between calls.
+    smoother is one of the filters in smoothing.py, exponential by default,
+    punch_detector one of the detectors in punches.py, slope by default.
+
+    A hand missing for lost_frames frames in a row counts as lost: its
+    history and punch detection are cleared and its smoothed box snaps to
+    wherever it is found again. cooldowns are the left and right hand's
+    punch cooldowns in seconds.
+    """
+    def __init__(self, history_size=32, lost_frames=3, smoother=None, punch_detector=None,
+                 cooldowns=(DEFAULT_COOLDOWN, DEFAULT_COOLDOWN)):
+        # Smooths the x_min, y_min, x_max, y_max of the left and right hand
+        self.smoother = smoother if smoother is not None else make_smoother()
+
+        # Decides which hands are punching in every frame
+        self.punch_detector = punch_detector if punch_detector is not None else make_punch_detector()
+
+        # Recent timestamps, centers and areas of each hand
+        self.histories = [HandHistory(history_size), HandHistory(history_size)]
+        self.lost_frames = lost_frames
+        self.missed_frames = np.zeros(2, dtype=np.intp)
+
+        self.punches = True  # Punch classification can be switched off
+
+        # Minimum time between two punches of the same hand, in nanoseconds
+        self.cooldown_ns = {"left": 0, "right": 0}
+        for hand, seconds in zip(("left", "right"), cooldowns):
+            self.set_cooldown(seconds, hand)
+        # Monotonic time, in nanoseconds, of each hand's last punch
+        self.last_punch_ns = {"left": None, "right": None}
+
+        # Column each hand is in, with hysteresis around the boundaries
+        self.column_tracker = ColumnTracker()
+
+    def classify(self, landmarks, w, h):
+        """
+        Detect column changes and punches in a LandmarkFrame. Returns a list
+        of every 'move_*', 'punch_left' and 'punch_right' in the frame, moves
+        first, empty if nothing happened.
+        """
+        gestures = []
+        # One box per hand, the first one wins if MediaPipe reports a hand twice
+        hand_index, first = np.unique(landmarks.hand_index, return_index=True)
+        self.track_lost_hands(hand_index)
+        points = landmarks.points[first]
+        smoothed = np.zeros((0, 4))
+
+        if len(hand_index):
+            boxes = landmarks.boxes(w, h)[first]
+
+            # Hands that were lost start over from where they are now
+            for i, box in zip(hand_index, boxes):
+                if not len(self.histories[i]):
+                    self.smoother.reset(i, box, landmarks.timestamp)
+
+            # Smooth position updates
+            smoothed = self.smoother.update(hand_index, boxes, landmarks.timestamp)
+
+            # Calculate hand area
+            centers = box_centers(smoothed)
+            for i, center, area in zip(hand_index, centers, box_areas(smoothed)):
+                self.histories[i].push(landmarks.timestamp, center, area)
+
+            # Trigger movement for every hand that changed column, once per column
+            changed = self.column_tracker.update(hand_index, centers, self.histories, w)
+            for column in self.column_tracker.columns[hand_index[changed]]:
+                gesture = f"move_{COLUMN_NAMES[column]}"
+                if gesture not in gestures:
+                    gestures.append(gesture)
+
+        # Time is taken from the frame so a replayed recording behaves the same.
+        # Frame timestamps come from time.monotonic(), the clock behind monotonic_ns().
+        now_ns = round(landmarks.timestamp * 1e9)
+        # The detector keeps its windows up to date even while punches are off
+        punching = self.punch_detector.update(hand_index, points, smoothed, landmarks.timestamp, w, h)
+        if self.punches:
+            # Both hands can land in the same frame
+            for i, (hand, gesture) in enumerate(zip(("left", "right"), PUNCH_GESTURES)):
+                if punching[i] and self.cooled_down(hand, now_ns):
+                    self.last_punch_ns[hand] = now_ns
+                    gestures.append(gesture)
+
+        return gestures
+
+    def set_cooldown(self, seconds, hand=None):
+        """Set the punch cooldown of one hand ('left' or 'right'), or of both if hand is None."""
+        for name in (hand,) if hand else self.cooldown_ns:
+            self.cooldown_ns[name] = round(seconds * 1e9)
+
+    def cooled_down(self, hand, now_ns):
+        """True if hand may punch again at now_ns."""
+        last = self.last_punch_ns[hand]
+        return last is None or now_ns - last >= self.cooldown_ns[hand]
+
+    def track_lost_hands(self, seen):
+        """Count frames each hand has been missing and reset the ones that are lost."""
+        self.missed_frames += 1
+        self.missed_frames[seen] = 0
+        for i in np.flatnonzero(self.missed_frames == self.lost_frames):
+            self.histories[i].reset()
+            self.punch_detector.reset(i)
@@ -0,0 +1,61 @@
+"""
+Column tracking with hysteresis and look-ahead.
+The frame is split into three columns. A hand only leaves its column once
+it is a band's width past the boundary, so a hand resting on a line can't
+make the player flap between two columns. A hand moving fast enough is
+judged by where it will be lookahead seconds from now, so a committed dodge
+is reported a few frames before the hand actually crosses.
+"""
+
+import numpy as np
+
+from .history import CENTER_X, TIMESTAMP
+
+
+class ColumnTracker:
+    """
+    Current column of each hand, as an index into COLUMN_NAMES.
+    band is the hysteresis on either side of a boundary and min_speed the
+    speed from which a hand's motion is extrapolated, both relative to the
+    frame width (min_speed in widths per second). velocity_frames is the
+    number of history samples the speed is measured over.
+    """
+    def __init__(self, band=0.04, lookahead=0.1, min_speed=0.5, velocity_frames=3):
+        self.band = band
+        self.lookahead = lookahead
+        self.min_speed = min_speed
+        self.velocity_frames = velocity_frames
+        self.columns = np.array([1, 1])
+
+    def velocity(self, history):
+        """Horizontal speed in pixels per second over the last few samples of a HandHistory."""
+        samples = history.latest(self.velocity_frames)
+        if len(samples) < 2:
+            return 0.0
+        dt = samples[-1, TIMESTAMP] - samples[0, TIMESTAMP]
+        if dt <= 0:
+            return 0.0
+        return (samples[-1, CENTER_X] - samples[0, CENTER_X]) / dt
+
+    def update(self, hand_index, centers, histories, w):
+        """
+        Move the hands in hand_index to the column their (smoothed) centers
+        and recent motion put them in. Returns the indices into hand_index
+        of the hands that changed column.
+        """
+        x = centers[:, 0]
+        speed = np.array([self.velocity(histories[i]) for i in hand_index])
+        fast = np.abs(speed) >= self.min_speed * w
+        x = np.where(fast, x + speed * self.lookahead, x)
+
+        # A boundary only counts as crossed band pixels beyond it
+        boundaries = (w / 3, 2 * w / 3)
+        band = self.band * w
+        right_of = np.digitize(x - band, boundaries)
+        left_of = np.digitize(x + band, boundaries)
+        current = self.columns[hand_index]
+        columns = np.where(right_of > current, right_of, np.where(left_of < current, left_of, current))
+
+        changed = np.flatnonzero(columns != current)
+        self.columns[hand_index[changed]] = columns[changed]
+        return changed
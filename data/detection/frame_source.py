@@ -0,0 +1,212 @@
+"""
+Frame sources for the hand detector.
+Everything that can feed the detection pipeline: the live camera, a recorded
+video, a directory of images or a synthetic generator. They all behave like
+cv2.VideoCapture as far as read() and release() go, so the FrameGrabber
+doesn't care where its frames come from. Like VideoCapture.read(), read()
+takes an optional array of the right shape to fill instead of allocating
+a new frame.
+
+Sources are picked with a spec string, usually from the REBOX_FRAME_SOURCE
+environment variable:
+    camera:0            the webcam with that index (the default)
+    camera:0:1280x720@60  the same, asking for another resolution and frame rate
+    video:clip.mp4      a video file, looped
+    images:some/dir     every image in a directory, in name order, looped
+    synthetic           procedurally generated frames, no hardware needed
+"""
+
+import os
+import time
+
+import cv2
+import numpy as np
+
+DEFAULT_SOURCE = "camera:0"
+CAMERA_SIZE = (640, 480)  # What the pipeline works at, no point decoding more
+CAMERA_FPS = 30
+CAMERA_FOURCCS = ("MJPG", "YUYV")  # Compressed first, it reaches higher frame rates over USB
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class _PacedSource:
+    """
+    Base class for sources that aren't a real camera. With realtime on,
+    read() waits so frames come out at fps, otherwise as fast as possible.
+    """
+    def __init__(self, fps=30, realtime=True):
+        self.fps = fps
+        self.realtime = realtime
+        self.next_frame_time = None
+
+    def wait_for_next_frame(self):
+        if not self.realtime:
+            return
+        now = time.monotonic()
+        if self.next_frame_time is None or now - self.next_frame_time > 1:
+            self.next_frame_time = now
+        elif self.next_frame_time > now:
+            time.sleep(self.next_frame_time - now)
+        self.next_frame_time += 1 / self.fps
+
+    def release(self):
+        pass
+
+
+def decode_fourcc(code):
+    """The four character string of a CAP_PROP_FOURCC value."""
+    code = int(code)
+    return "".join(chr((code >> 8 * i) & 0xFF) for i in range(4))
+
+
+class CameraSource:
+    """
+    A live camera opened through cv2.VideoCapture. On opening it asks for
+    size, fps and the first of fourccs the camera accepts at that size,
+    with a one frame buffer so reads always get a fresh frame. Cameras
+    are free to grant something else, what they did is kept in granted
+    and printed.
+    """
+    def __init__(self, index=0, size=CAMERA_SIZE, fps=CAMERA_FPS, fourccs=CAMERA_FOURCCS):
+        self.index = index
+        self.capture = cv2.VideoCapture(index)
+        self.granted = None
+        if self.capture.isOpened():
+            self.granted = self.negotiate(size, fps, fourccs)
+            w, h = size
+            gw, gh = self.granted["size"]
+            print(f"Camera {index}: {gw}x{gh} @ {self.granted['fps']:g} fps {self.granted['fourcc']!r} "
+                  f"(asked for {w}x{h} @ {fps:g} fps {'/'.join(fourccs)})")
+        else:
+            print(f"Camera {index} could not be opened")
+
+    def negotiate(self, size, fps, fourccs):
+        """Try each fourcc until the camera grants it at size. Returns what was granted."""
+        w, h = size
+        self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        for fourcc in fourccs:
+            self.capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, w)
+            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
+            self.capture.set(cv2.CAP_PROP_FPS, fps)
+            granted = self.read_format()
+            if granted["fourcc"] == fourcc and granted["size"] == (w, h):
+                break
+        return granted
+
+    def read_format(self):
+        """Size, fps, fourcc and buffer size the camera is currently set to."""
+        return {
+            "size": (int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))),
+            "fps": self.capture.get(cv2.CAP_PROP_FPS),
+            "fourcc": decode_fourcc(self.capture.get(cv2.CAP_PROP_FOURCC)),
+            "buffer_size": int(self.capture.get(cv2.CAP_PROP_BUFFERSIZE)),
+        }
+
+    def read(self, out=None):
+        return self.capture.read(out)
+
+    def release(self):
+        self.capture.release()
+
+
+class VideoFileSource(_PacedSource):
+    """A recorded video, played at its own frame rate and looped by default."""
+    def __init__(self, path, loop=True, realtime=True):
+        self.path = path
+        self.loop = loop
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise IOError(f"Could not open video file {path}")
+        fps = self.capture.get(cv2.CAP_PROP_FPS) or 30
+        _PacedSource.__init__(self, fps, realtime)
+
+    def read(self, out=None):
+        self.wait_for_next_frame()
+        success, frame = self.capture.read(out)
+        if not success and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, frame = self.capture.read(out)
+        return success, frame
+
+    def release(self):
+        self.capture.release()
+
+
+class ImageSequenceSource(_PacedSource):
+    """Every image in a directory, in file name order, looped by default."""
+    def __init__(self, directory, fps=30, loop=True, realtime=True):
+        _PacedSource.__init__(self, fps, realtime)
+        self.paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS)
+        if not self.paths:
+            raise IOError(f"No images found in {directory}")
+        self.loop = loop
+        self.index = 0
+
+    def read(self, out=None):
+        if self.index >= len(self.paths):
+            if not self.loop:
+                return False, None
+            self.index = 0
+        self.wait_for_next_frame()
+        frame = cv2.imread(self.paths[self.index])
+        self.index += 1
+        if frame is None:
+            return False, None
+        if out is not None and out.shape == frame.shape:
+            np.copyto(out, frame)
+            frame = out
+        return True, frame
+
+
+class SyntheticSource(_PacedSource):
+    """
+    Procedurally generated frames: two skin coloured blobs drifting over a
+    noisy background. MediaPipe won't see hands in them, but every stage of
+    the pipeline gets real pixel work to do.
+    """
+    def __init__(self, size=(640, 480), fps=30, realtime=True, seed=0):
+        _PacedSource.__init__(self, fps, realtime)
+        self.size = size
+        self.frame_count = 0
+        rng = np.random.default_rng(seed)
+        w, h = size
+        self.background = rng.integers(40, 90, (h, w, 3), dtype=np.uint8)
+
+    def read(self, out=None):
+        self.wait_for_next_frame()
+        w, h = self.size
+        if out is not None and out.shape == self.background.shape:
+            np.copyto(out, self.background)
+            frame = out
+        else:
+            frame = self.background.copy()
+        t = self.frame_count / self.fps
+        for phase, offset in ((0.0, 0.3), (np.pi, 0.7)):
+            center = (int(w * (offset + 0.15 * np.sin(t + phase))), int(h * (0.5 + 0.1 * np.cos(2 * t))))
+            radius = int(h * (0.08 + 0.03 * (1 + np.sin(3 * t + phase))))
+            cv2.circle(frame, center, radius, (120, 160, 210), -1)
+        self.frame_count += 1
+        return True, frame
+
+
+def open_source(spec=None):
+    """Open the frame source described by spec, see the module docstring."""
+    if spec is None:
+        spec = os.environ.get("REBOX_FRAME_SOURCE", DEFAULT_SOURCE)
+    kind, _, argument = spec.partition(":")
+    if kind == "camera":
+        index, _, camera_format = argument.partition(":")
+        if not camera_format:
+            return CameraSource(int(index or 0))
+        size, _, fps = camera_format.partition("@")
+        w, _, h = size.partition("x")
+        return CameraSource(int(index or 0), (int(w), int(h)), float(fps or CAMERA_FPS))
+    elif kind == "video":
+        return VideoFileSource(argument)
+    elif kind == "images":
+        return ImageSequenceSource(argument)
+    elif kind == "synthetic":
+        return SyntheticSource()
+    raise ValueError(f"Unknown frame source {spec!r}")
@@ -0,0 +1,39 @@
+"""
+Fixed-size per-hand history for the gesture classifier.
+"""
+
+import numpy as np
+
+TIMESTAMP, CENTER_X, CENTER_Y, AREA = range(4)
+
+
+class HandHistory:
+    """
+    Circular buffer with the last `capacity` samples of one hand. Each row
+    holds the capture timestamp, the smoothed box center and its area.
+    Memory use stays the same no matter how long the hand is tracked.
+    """
+    def __init__(self, capacity=32):
+        self.capacity = capacity
+        self.data = np.zeros((capacity, 4))
+        self.count = 0
+        self.index = 0  # Row the next sample goes to
+
+    def __len__(self):
+        return self.count
+
+    def reset(self):
+        """Forget everything, used when tracking of the hand is lost."""
+        self.count = 0
+        self.index = 0
+
+    def push(self, timestamp, center, area):
+        self.data[self.index] = timestamp, center[0], center[1], area
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self, n=None):
+        """The last n samples (all of them by default) as rows, oldest first."""
+        n = self.count if n is None else min(n, self.count)
+        rows = (self.index - n + np.arange(n)) % self.capacity
+        return self.data[rows]
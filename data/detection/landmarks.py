@@ -0,0 +1,74 @@
+"""
+Compact, array-backed hand landmarks.
+MediaPipe results are walked once per frame and turned into a LandmarkFrame,
+everything downstream works on its NumPy arrays.
+"""
+
+import numpy as np
+
+HAND_LABELS = ("Left", "Right")  # Index 0 is the left hand, 1 the right one
+COLUMN_NAMES = ("right", "middle", "left")  # Camera image is mirrored
+NUM_LANDMARKS = 21
+
+
+class LandmarkFrame:
+    """
+    Landmarks of every hand found in one camera frame.
+    points is a float32 (hands, 21, 3) array of normalized x, y, z,
+    hand_index holds 0 (left) or 1 (right) for each hand and timestamp is
+    the monotonic time the frame was captured at.
+    """
+    def __init__(self, points, hand_index, timestamp=0.0):
+        self.points = points
+        self.hand_index = hand_index
+        self.timestamp = timestamp
+
+    @classmethod
+    def empty(cls, timestamp=0.0):
+        return cls(np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32), np.zeros(0, dtype=np.intp), timestamp)
+
+    @classmethod
+    def from_results(cls, results, timestamp=0.0):
+        """Convert the MediaPipe Hands protobuf results."""
+        if not results.multi_hand_landmarks:
+            return cls.empty(timestamp)
+        points = np.array([[(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark]
+                           for hand_landmarks in results.multi_hand_landmarks], dtype=np.float32)
+        hand_index = np.array([HAND_LABELS.index(handedness.classification[0].label)
+                               for handedness in results.multi_handedness], dtype=np.intp)
+        return cls(points, hand_index, timestamp)
+
+    @classmethod
+    def from_task_result(cls, result, timestamp=0.0):
+        """Convert a MediaPipe Tasks HandLandmarkerResult."""
+        if not result.hand_landmarks:
+            return cls.empty(timestamp)
+        points = np.array([[(lm.x, lm.y, lm.z) for lm in hand_landmarks]
+                           for hand_landmarks in result.hand_landmarks], dtype=np.float32)
+        hand_index = np.array([HAND_LABELS.index(handedness[0].category_name)
+                               for handedness in result.handedness], dtype=np.intp)
+        return cls(points, hand_index, timestamp)
+
+    def __len__(self):
+        return len(self.points)
+
+    def map_from_crop(self, box, w, h):
+        """Convert landmarks found in a crop of the frame back to full frame coordinates, in place."""
+        x0, y0, x1, y1 = box
+        self.points[..., 0] = (x0 + self.points[..., 0] * (x1 - x0)) / w
+        self.points[..., 1] = (y0 + self.points[..., 1] * (y1 - y0)) / h
+
+    def boxes(self, w, h):
+        """(hands, 4) int array of x_min, y_min, x_max, y_max in pixels."""
+        pixels = (self.points[..., :2] * (w, h)).astype(np.int32)
+        return np.concatenate((pixels.min(axis=1), pixels.max(axis=1)), axis=1)
+
+
+def box_centers(boxes):
+    """Center x, y of every x_min, y_min, x_max, y_max box."""
+    return (boxes[..., :2] + boxes[..., 2:]) / 2
+
+
+def box_areas(boxes):
+    """Area of every x_min, y_min, x_max, y_max box."""
+    return (boxes[..., 2] - boxes[..., 0]) * (boxes[..., 3] - boxes[..., 1])
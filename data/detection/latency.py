@@ -0,0 +1,79 @@
+"""
+Capture-to-consumption latency of detected gestures.
+Every gesture carries the monotonic time its frame was captured at, when
+inference and classification finished, and when the game consumed it.
+LatencyStats keeps the last few hundred durations of each stage and
+reports their percentiles, along with how many camera frames were read and
+how many the capture ring overwrote before detection got to them.
+"""
+
+import json
+
+import numpy as np
+
+# Stage name, timestamp it starts at, timestamp it ends at
+STAGES = (
+    ("inference", "captured_at", "inferred_at"),
+    ("classification", "inferred_at", "classified_at"),
+    ("delivery", "classified_at", "consumed_at"),
+    ("total", "captured_at", "consumed_at"),
+)
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyStats:
+    """Rolling window of the durations, in milliseconds, of every stage."""
+    def __init__(self, window=512):
+        self.window = window
+        self.samples = np.zeros((len(STAGES), window))
+        self.count = 0
+        self.index = 0
+        self.frames = 0  # Frames detection took from the capture ring
+        self.dropped = 0  # Frames overwritten before detection saw them
+
+    def count_frames(self, frames, dropped):
+        """Add frames taken by detection and frames dropped in front of it."""
+        self.frames += frames
+        self.dropped += dropped
+
+    def record(self, timestamps):
+        """Add one gesture, given a dict with all of the timestamps in STAGES."""
+        for row, (_, start, end) in enumerate(STAGES):
+            self.samples[row, self.index] = (timestamps[end] - timestamps[start]) * 1000
+        self.index = (self.index + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+
+    def record_event(self, event, consumed_at):
+        """Add a GESTURE event consumed at consumed_at."""
+        timestamps = {name: getattr(event, name) for _, name, _ in STAGES[:3]}
+        timestamps["consumed_at"] = consumed_at
+        self.record(timestamps)
+
+    def percentiles(self):
+        """{stage: (p50, p95, p99)} in milliseconds, empty until something was recorded."""
+        if not self.count:
+            return {}
+        values = np.percentile(self.samples[:, :self.count], PERCENTILES, axis=1)
+        return {name: tuple(values[:, row]) for row, (name, _, _) in enumerate(STAGES)}
+
+    def summary(self):
+        """One line of text per stage and one for dropped frames, for the debug overlay."""
+        lines = [f"{name:<15}" + " ".join(f"p{p} {value:6.1f}" for p, value in zip(PERCENTILES, values)) + " ms"
+                 for name, values in self.percentiles().items()]
+        if self.frames or self.dropped:
+            share = self.dropped / (self.frames + self.dropped) * 100
+            lines.append(f"{'frames':<15}{self.frames} read, {self.dropped} dropped ({share:.1f}%)")
+        return lines
+
+    def dump(self, path):
+        """Write the percentiles and raw samples to path as JSON."""
+        data = {
+            "samples": self.count,
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "percentiles": {name: dict(zip((f"p{p}" for p in PERCENTILES), values))
+                            for name, values in self.percentiles().items()},
+            "raw_ms": {name: self.samples[row, :self.count].tolist() for row, (name, _, _) in enumerate(STAGES)},
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=1)
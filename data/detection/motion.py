@@ -0,0 +1,45 @@
+"""
+Motion gate in front of hand inference.
+Every frame is shrunk to a tiny grayscale thumbnail and compared with the
+thumbnail of the last frame that went through inference. While nothing
+has changed there is no point asking MediaPipe again, the pipeline reuses
+the landmarks it already has. A refresh is forced every refresh_interval
+seconds so tracking can't go stale.
+"""
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    A thumbnail pixel has moved when its gray value changed by more than
+    pixel_threshold; inference runs when more than min_fraction of them
+    did. size is the width and height of the thumbnail.
+    """
+    def __init__(self, size=(32, 24), pixel_threshold=12, min_fraction=0.005, refresh_interval=0.5):
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.min_pixels = max(1, int(size[0] * size[1] * min_fraction))
+        self.refresh_interval = refresh_interval
+        w, h = size
+        self.small = np.empty((h, w, 3), dtype=np.uint8)
+        self.thumbnail = np.empty((h, w), dtype=np.uint8)
+        self.reference = np.empty((h, w), dtype=np.uint8)
+        self.difference = np.empty((h, w), dtype=np.uint8)
+        self.last_inference = None  # Capture time of the frame the reference came from
+        self.skipped = 0  # Frames that didn't need inference
+
+    def should_infer(self, frame, timestamp):
+        """True if frame, captured at timestamp, moved enough (or is due) to run inference on."""
+        cv2.resize(frame, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=self.thumbnail)
+        if self.last_inference is not None and timestamp - self.last_inference < self.refresh_interval:
+            cv2.absdiff(self.thumbnail, self.reference, dst=self.difference)
+            cv2.threshold(self.difference, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self.difference)
+            if cv2.countNonZero(self.difference) < self.min_pixels:
+                self.skipped += 1
+                return False
+        np.copyto(self.reference, self.thumbnail)
+        self.last_inference = timestamp
+        return True
@@ -0,0 +1,198 @@
+"""
+The per-frame detection pipeline: resize, MediaPipe inference and
+gesture classification. Shared by the in-game detection thread and the
+out-of-process worker.
+"""
+
+import collections
+import time
+
+import cv2
+import numpy as np
+
+from .classifier import GestureClassifier
+from .landmarks import LandmarkFrame
+from .motion import MotionGate
+from .roi import RegionOfInterest
+
+TARGET_SIZE = (640, 480)  # Width and height handed to MediaPipe
+
+WARM_UP_FRAMES = 8  # Dummy frames per input size
+BACKEND_PROGRESS = 0.2  # Share of the warm-up progress creating the backend stands for
+WARM_UP_TIMEOUT = 10  # Seconds to wait for an asynchronous backend to finish one of them
+
+# Stages process() times, in order
+STAGES = ("motion", "resize", "convert", "inference", "landmarks", "classify")
+
+
+class DetectionPipeline:
+    """
+    Runs one camera frame at a time through a hand backend (see backends.py)
+    and the classifier. The image handed to the backend and the newest
+    LandmarkFrame are kept around for anybody who wants to look at them.
+
+    With roi enabled only a crop around the hands of the previous frame is
+    processed, see RegionOfInterest. Crops smaller than the input size are
+    upsampled to it, larger ones are handed over as they are. Given a LandmarkRecorder, every
+    LandmarkFrame is recorded as well.
+
+    Resized and converted images go into buffers that are allocated once
+    and reused. Backends whose color_order attribute is "BGR" get the
+    camera's own layout and skip the colour conversion entirely.
+
+    With an asynchronous backend a frame's landmarks usually come back
+    during a later call; frames whose inference hasn't finished yet are
+    simply not classified.
+
+    With motion_gate enabled, frames in which nothing moved skip the backend
+    and are classified with the landmarks of the last frame, see MotionGate.
+    """
+    def __init__(self, hands, classifier=None, roi=False, recorder=None, motion_gate=False):
+        self.hands = hands
+        self.classifier = classifier if classifier is not None else GestureClassifier()
+        self.roi = RegionOfInterest() if roi else None
+        self.recorder = recorder
+        self.motion_gate = MotionGate() if motion_gate else None
+        self.input_size = TARGET_SIZE
+        self.rate = None  # Inferences per second, None for as fast as frames come
+        self.frame_resized = None
+        self.landmarks = LandmarkFrame.empty()
+        self.color_order = hands.color_order
+        # Crop box and frame size of every frame still in flight, by capture time
+        self.crops = collections.OrderedDict()
+        self.buffers = {}  # Preallocated output images, by stage
+        self.stage_times = np.zeros(len(STAGES))  # Seconds each of STAGES took on the last frame
+        # Monotonic times the last frame finished inference and classification
+        self.inferred_at = None
+        self.classified_at = None
+
+    def apply_profile(self, profile):
+        """Take over the rate, punch classification and input size of a DetectionProfile."""
+        self.rate = profile.rate
+        self.input_size = profile.input_size
+        self.classifier.punches = profile.punches
+
+    def warm_up(self, sizes, frames=WARM_UP_FRAMES, progress=None, keep_going=None, start=BACKEND_PROGRESS):
+        """
+        Run dummy frames of every input size through the backend so the first
+        real frame doesn't pay for graph initialisation. progress(fraction)
+        is called after each one, going from start to 1; keep_going()
+        returning False stops early.
+        """
+        rng = np.random.default_rng(0)
+        steps = len(sizes) * frames
+        done = 0
+        for w, h in sizes:
+            image = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+            for _ in range(frames):
+                # Asynchronous backends only count once a result came back
+                deadline = time.monotonic() + WARM_UP_TIMEOUT
+                while self.hands.detect(image, time.monotonic()) is None and time.monotonic() < deadline:
+                    if keep_going is not None and not keep_going():
+                        return
+                    time.sleep(0.005)
+                if keep_going is not None and not keep_going():
+                    return
+                done += 1
+                if progress is not None:
+                    progress(start + (1 - start) * done / steps)
+
+    def buffer(self, name, shape):
+        """The preallocated image for a stage, reallocated only when its shape changes."""
+        image = self.buffers.get(name)
+        if image is None or image.shape != shape:
+            image = self.buffers[name] = np.empty(shape, dtype=np.uint8)
+        return image
+
+    def roi_size(self, crop_w, crop_h):
+        """Width and height a crop is resized to: up to the input size, never below its own."""
+        iw, ih = self.input_size
+        scale = max(min(iw / crop_w, ih / crop_h), 1)
+        return round(crop_w * scale), round(crop_h * scale)
+
+    def throttle(self, started_at):
+        """Sleep out the rest of the slot of a frame started at started_at, if the rate is limited."""
+        if self.rate:
+            remaining = 1 / self.rate - (time.monotonic() - started_at)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def process(self, frame, captured_at=None):
+        """Run a BGR camera frame through the pipeline. Returns the list of gestures in it."""
+        if captured_at is None:
+            captured_at = time.monotonic()
+        h, w, _ = frame.shape
+        times = self.stage_times
+        times[:] = 0
+        started_at = time.monotonic()
+
+        if self.motion_gate is not None and not self.motion_gate.should_infer(frame, captured_at):
+            # Nothing moved, the last landmarks still hold for this frame
+            self.landmarks = LandmarkFrame(self.landmarks.points, self.landmarks.hand_index, captured_at)
+            self.inferred_at = time.monotonic()
+            times[0] = self.inferred_at - started_at
+            return self.classify(w, h)
+        gated_at = time.monotonic()
+        times[0] = gated_at - started_at
+
+        box = self.roi.next_crop() if self.roi is not None else None
+        if box is None and (w, h) == self.input_size:
+            # The camera already delivers the size MediaPipe gets
+            self.frame_resized = frame
+        elif box is None:
+            iw, ih = self.input_size
+            self.frame_resized = cv2.resize(frame, self.input_size, dst=self.buffer("resized", (ih, iw, 3)))
+        else:
+            x0, y0, x1, y1 = box
+            rw, rh = self.roi_size(x1 - x0, y1 - y0)
+            self.frame_resized = cv2.resize(frame[y0:y1, x0:x1], (rw, rh), dst=self.buffer("roi", (rh, rw, 3)),
+                                            interpolation=cv2.INTER_LINEAR)
+
+        resized_at = time.monotonic()
+
+        # Convert frame to RGB, unless the backend takes BGR as it is
+        if self.color_order == "BGR":
+            image = self.frame_resized
+        else:
+            image = cv2.cvtColor(self.frame_resized, cv2.COLOR_BGR2RGB,
+                                 dst=self.buffer("rgb", self.frame_resized.shape))
+        converted_at = time.monotonic()
+
+        if self.roi is not None:
+            self.crops[captured_at] = box
+            while len(self.crops) > 32:
+                self.crops.popitem(last=False)
+        landmarks = self.hands.detect(image, captured_at)
+        detected_at = time.monotonic()
+
+        times[1] = resized_at - gated_at
+        times[2] = converted_at - resized_at
+        times[3] = detected_at - converted_at
+        if landmarks is None:
+            # Still in flight, nothing new to classify
+            return []
+        self.landmarks = landmarks
+        self.inferred_at = self.hands.inferred_at
+
+        if self.roi is not None:
+            # The crop these landmarks were found in, older frames were dropped by the backend
+            crop = None
+            while self.crops:
+                timestamp, crop = self.crops.popitem(last=False)
+                if timestamp >= landmarks.timestamp:
+                    break
+            if crop is not None:
+                self.landmarks.map_from_crop(crop, w, h)
+            self.roi.update(self.landmarks, w, h)
+        times[4] = time.monotonic() - detected_at
+        return self.classify(w, h)
+
+    def classify(self, w, h):
+        """Record and classify the current landmarks."""
+        started_at = time.monotonic()
+        if self.recorder is not None:
+            self.recorder.record(self.landmarks, w, h)
+        gestures = self.classifier.classify(self.landmarks, w, h)
+        self.classified_at = time.monotonic()
+        self.stage_times[5] = self.classified_at - started_at
+        return gestures
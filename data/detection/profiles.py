@@ -0,0 +1,38 @@
+"""
+Detection profiles: how hard the hand detector works for a given state.
+Every state declares one; the state machine hands it to the detector
+whenever the active state changes.
+"""
+
+
+class DetectionProfile:
+    """
+    rate is the target number of inferences per second, None to run at the
+    camera's frame rate. punches turns punch classification on or off and
+    input_size is the width and height of the image handed to MediaPipe.
+    """
+    def __init__(self, name, rate=None, punches=True, input_size=(640, 480)):
+        self.name = name
+        self.rate = rate
+        self.punches = punches
+        self.input_size = input_size
+
+    def __repr__(self):
+        return f"DetectionProfile({self.name!r})"
+
+
+# A fight: every frame, full resolution
+FIGHT = DetectionProfile("fight")
+
+# Menus only need a column change or a punch to confirm now and then
+MENU = DetectionProfile("menu", rate=15, input_size=(320, 240))
+
+# Waiting for any sign of a player at all
+IDLE = DetectionProfile("idle", rate=5, punches=False, input_size=(320, 240))
+
+PROFILES = (FIGHT, MENU, IDLE)
+
+
+def input_sizes():
+    """Every input size a profile can ask for, for warming up the backend."""
+    return sorted({profile.input_size for profile in PROFILES})
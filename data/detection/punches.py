@@ -0,0 +1,181 @@
+"""
+Punch detection for the gesture classifier.
+A punch detector looks at every frame's hands and says which of them are
+punching; the classifier adds the cooldown on top. There are two:
+    slope       the original heuristic, the least-squares slope of the
+                smoothed box area over a few frames above a fixed number
+                of pixels, the default
+    velocity    a linear model over how fast a few landmark features change,
+                fitted offline from recordings
+
+The velocity features are rates per second of the logarithm of the hand's
+box area and length (wrist to middle knuckle), and of how far the knuckles
+are in front of the wrist, in hand lengths. Logarithms and hand lengths
+make them the same whatever the camera resolution and however far away the
+player stands, so one set of weights fits everybody. They are taken over
+the last window frames of both hands at once.
+
+Detectors are picked with a spec string, usually from the
+REBOX_PUNCH_DETECTOR environment variable:
+    slope:window=5,threshold=600
+    velocity:punches.json           weights fitted with replay --fit-punches
+    velocity                        hand-set weights, only a starting point
+                                    until a fitted model is at hand
+"""
+
+import json
+
+import numpy as np
+
+from .landmarks import box_areas
+from .slope import RollingSlope
+
+DEFAULT_PUNCH_DETECTOR = "slope"
+
+# Gesture of a punch by the left and by the right hand, the camera image is mirrored
+PUNCH_GESTURES = ("punch_right", "punch_left")
+
+FEATURES = ("area_rate", "length_rate", "knuckle_depth_rate")
+WRIST, MIDDLE_KNUCKLE = 0, 9
+KNUCKLES = [5, 9, 13, 17]
+
+# Hand-set weights for a velocity detector without a fitted model: an area
+# doubling in a third of a second is a punch. Not tuned against any
+# recording, so they answer to noise the fitted weights learn to ignore
+DEFAULT_WEIGHTS = (0.5, 1.0, 0.5)
+DEFAULT_BIAS = -2.0
+DEFAULT_WINDOW = 3
+
+
+def hand_features(points, w, h):
+    """
+    Log box area, log hand length and knuckle depth of every hand in a
+    (hands, 21, 3) array of normalized landmarks, as a (hands, 3) array.
+    """
+    pixels = points[..., :2] * (w, h)
+    extent = pixels.max(axis=1) - pixels.min(axis=1)
+    area = np.maximum(extent[:, 0] * extent[:, 1], 1)
+    length = np.maximum(np.linalg.norm(pixels[:, MIDDLE_KNUCKLE] - pixels[:, WRIST], axis=1), 1)
+    # MediaPipe's z is relative to the wrist and scaled like x, negative towards the camera
+    depth = (points[:, WRIST, 2] - points[:, KNUCKLES, 2].mean(axis=1)) * w / length
+    return np.stack((np.log(area), np.log(length), depth), axis=1)
+
+
+class VelocityPunchDetector:
+    """
+    A hand is punching when weights . rates + bias > 0, where rates are the
+    least-squares slopes of its hand_features over its last window frames,
+    in units per second. A hand can't punch until it has been seen window
+    times since it was last lost.
+    """
+    def __init__(self, weights=DEFAULT_WEIGHTS, bias=DEFAULT_BIAS, window=DEFAULT_WINDOW):
+        if window < 2:
+            raise ValueError("VelocityPunchDetector needs a window of at least 2 frames")
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.window = int(window)
+        # Timestamp and features of the last window frames of each hand, oldest first
+        self.samples = np.zeros((2, self.window, 1 + len(FEATURES)))
+        self.count = np.zeros(2, dtype=np.intp)
+        self.scores = np.full(2, -np.inf)  # Score of each hand in the last frame
+
+    @classmethod
+    def load(cls, path):
+        """A detector with the weights of a model file written by replay --fit-punches."""
+        with open(path) as f:
+            model = json.load(f)
+        if tuple(model["features"]) != FEATURES:
+            raise ValueError(f"{path} was fitted on features {model['features']}, expected {list(FEATURES)}")
+        return cls(model["weights"], model["bias"], model["window"])
+
+    def reset(self, i):
+        """Forget hand i, used when its tracking is lost."""
+        self.count[i] = 0
+
+    def push(self, hand_index, points, timestamp, w, h):
+        """Add the landmarks of the hands in hand_index to their windows."""
+        self.samples[hand_index, :-1] = self.samples[hand_index, 1:]
+        self.samples[hand_index, -1, 0] = timestamp
+        self.samples[hand_index, -1, 1:] = hand_features(points, w, h)
+        self.count[hand_index] += 1
+
+    def rates(self):
+        """(2, features) rates of change over each hand's window and whether the window is full."""
+        times = self.samples[..., :1] - self.samples[..., :1].mean(axis=1, keepdims=True)
+        values = self.samples[..., 1:] - self.samples[..., 1:].mean(axis=1, keepdims=True)
+        spread = (times * times).sum(axis=1)
+        rates = (times * values).sum(axis=1) / np.where(spread > 0, spread, np.inf)
+        return rates, self.count >= self.window
+
+    def update(self, hand_index, points, boxes, timestamp, w, h):
+        """Which hands, left and right, are punching in this frame, as a (2,) bool array."""
+        punching = np.zeros(2, dtype=bool)
+        if not len(hand_index):
+            self.scores[:] = -np.inf
+            return punching
+        self.push(hand_index, points, timestamp, w, h)
+        rates, ready = self.rates()
+        seen = np.zeros(2, dtype=bool)
+        seen[hand_index] = True
+        self.scores = np.where(seen & ready, rates @ self.weights + self.bias, -np.inf)
+        return self.scores > 0
+
+
+class AreaSlopePunchDetector:
+    """
+    The original heuristic: a hand punches while the slope of its smoothed
+    box area over the last window frames is above threshold pixels per
+    frame. A hand can't punch until it has filled its window since it was
+    last lost, whatever the other hand is doing.
+    """
+    def __init__(self, window=5, threshold=600):
+        self.slopes = [RollingSlope(int(window)), RollingSlope(int(window))]
+        self.threshold = threshold
+
+    def reset(self, i):
+        self.slopes[i].reset()
+
+    def update(self, hand_index, points, boxes, timestamp, w, h):
+        for i, area in zip(hand_index, box_areas(boxes)):
+            self.slopes[i].push(area)
+        return np.array([slope.ready and slope.slope > self.threshold for slope in self.slopes])
+
+
+def fit_logistic(features, labels, iterations=3000, learning_rate=0.5, l2=1e-3):
+    """
+    Fit a logistic regression of labels (0 or 1) on the rows of features by
+    gradient descent. Positives and negatives weigh the same however rare
+    punches are. Returns weights and bias in the units of the features.
+    """
+    features = np.asarray(features, dtype=np.float64)
+    labels = np.asarray(labels, dtype=np.float64)
+    mean = features.mean(axis=0)
+    std = features.std(axis=0)
+    std[std == 0] = 1
+    x = (features - mean) / std
+    positives = labels.sum()
+    sample_weights = np.where(labels == 1, 0.5 / max(positives, 1), 0.5 / max(len(labels) - positives, 1))
+
+    weights = np.zeros(x.shape[1])
+    bias = 0.0
+    for _ in range(iterations):
+        predicted = 1 / (1 + np.exp(-(x @ weights + bias)))
+        error = (predicted - labels) * sample_weights
+        weights -= learning_rate * (x.T @ error + l2 * weights)
+        bias -= learning_rate * error.sum()
+    # Undo the standardisation
+    return weights / std, bias - (weights * mean / std).sum()
+
+
+def make_punch_detector(spec=None):
+    """Build the punch detector described by spec, see the module docstring."""
+    kind, _, argument = (spec or DEFAULT_PUNCH_DETECTOR).partition(":")
+    if kind == "velocity":
+        return VelocityPunchDetector.load(argument) if argument else VelocityPunchDetector()
+    elif kind == "slope":
+        kwargs = {}
+        for item in filter(None, argument.split(",")):
+            key, _, value = item.partition("=")
+            kwargs[key.strip()] = float(value)
+        return AreaSlopePunchDetector(**kwargs)
+    raise ValueError(f"Unknown punch detector {spec!r}")
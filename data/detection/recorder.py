@@ -0,0 +1,92 @@
+"""
+Recording of the landmark stream.
+Every LandmarkFrame the pipeline produces can be kept and written to a
+compact .npz file, which replay.py feeds back through the classifier.
+Frames are written out in chunks as they come, so a long session neither
+piles up in memory nor gets lost with the game.
+"""
+
+import zipfile
+
+import numpy as np
+
+from .landmarks import NUM_LANDMARKS, LandmarkFrame
+
+CHUNK_FRAMES = 300  # About ten seconds of frames
+
+
+class LandmarkRecorder:
+    """
+    Collects LandmarkFrames and appends them to the .npz file at path every
+    chunk_frames frames; save() writes whatever is left. Each chunk n adds
+    these arrays, named with an _n suffix (points_00000, ...):
+        points        float32 (total hands, 21, 3), every hand of every frame
+        hand_index    0 (left) or 1 (right) for each of those hands
+        offsets       where each frame's hands start in points, plus the end
+        timestamps    capture time of each frame
+        frame_size    width and height of the camera frames
+    The file is complete after every chunk, an existing one is overwritten.
+    """
+    def __init__(self, path, chunk_frames=CHUNK_FRAMES):
+        # Same as np.savez
+        self.path = path if str(path).endswith(".npz") else f"{path}.npz"
+        self.chunk_frames = chunk_frames
+        self.frame_size = (0, 0)
+        self.points = []
+        self.hand_index = []
+        self.timestamps = []
+        self.chunks = 0  # Chunks written so far
+        self.written = 0  # Frames in them
+
+    def __len__(self):
+        return self.written + len(self.timestamps)
+
+    def record(self, landmarks, w, h):
+        self.frame_size = (w, h)
+        self.points.append(landmarks.points.copy())
+        self.hand_index.append(landmarks.hand_index.copy())
+        self.timestamps.append(landmarks.timestamp)
+        if len(self.timestamps) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        """Append the frames collected since the last chunk to the file."""
+        if not self.timestamps and self.chunks:
+            return
+        counts = [len(points) for points in self.points]
+        empty = np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32)
+        arrays = {
+            "points": np.concatenate(self.points) if self.points else empty,
+            "hand_index": np.concatenate(self.hand_index) if self.hand_index else np.zeros(0, dtype=np.intp),
+            "offsets": np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            "timestamps": np.array(self.timestamps, dtype=np.float64),
+            "frame_size": np.array(self.frame_size),
+        }
+        mode = "a" if self.chunks else "w"
+        with zipfile.ZipFile(self.path, mode, compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, array in arrays.items():
+                with archive.open(f"{name}_{self.chunks:05d}.npy", "w", force_zip64=True) as f:
+                    np.lib.format.write_array(f, array, allow_pickle=False)
+        self.chunks += 1
+        self.written += len(self.timestamps)
+        self.points.clear()
+        self.hand_index.clear()
+        self.timestamps.clear()
+
+    def save(self):
+        self.flush()
+
+
+def load_recording(path):
+    """Read a recording back. Returns a list of LandmarkFrames and the (w, h) frame size."""
+    frames = []
+    w, h = 0, 0
+    with np.load(path) as data:
+        # Recordings from before chunking hold a single chunk with no suffix
+        suffixes = sorted(name[len("offsets"):] for name in data.files if name.startswith("offsets"))
+        for suffix in suffixes:
+            points, hand_index, offsets = data["points" + suffix], data["hand_index" + suffix], data["offsets" + suffix]
+            frames.extend(LandmarkFrame(points[start:end], hand_index[start:end], float(timestamp))
+                          for start, end, timestamp in zip(offsets[:-1], offsets[1:], data["timestamps" + suffix]))
+            w, h = data["frame_size" + suffix]
+    return frames, (int(w), int(h))
@@ -0,0 +1,358 @@
+"""
+Offline replay of recorded landmark streams.
+Runs recordings made with REBOX_RECORD_LANDMARKS through the gesture
+classifier as fast as it can go, so its settings can be tuned against real
+motion and classifier changes can be checked without a camera.
+--smoothing-report measures how much lag and jitter a smoother leaves.
+
+    python -m data.detection.replay session.npz --damping 0.2 --cooldown 0.5
+    python -m data.detection.replay session.npz --smoothing one-euro:beta=0.02 --smoothing-report
+    python -m data.detection.replay session.npz --save expected.json
+    python -m data.detection.replay session.npz --compare expected.json
+
+--labels scores the punches found against a file of the true ones, in the
+format --save writes, so a saved run can be corrected by hand and used as
+labels. --fit-punches fits the weights of the velocity punch detector to
+the recordings and writes them out for REBOX_PUNCH_DETECTOR=velocity:<file>.
+Without --labels it learns to find the punches of the slope heuristic,
+as early as it can.
+
+    python -m data.detection.replay a.npz b.npz --fit-punches punches.json --labels labels.json
+    python -m data.detection.replay a.npz b.npz --punch-detector velocity:punches.json --labels labels.json
+"""
+
+import argparse
+import collections
+import json
+import sys
+import time
+
+import numpy as np
+
+from .classifier import GestureClassifier
+from .landmarks import box_centers
+from .punches import (DEFAULT_WINDOW, FEATURES, PUNCH_GESTURES, VelocityPunchDetector, fit_logistic,
+                      make_punch_detector)
+from .recorder import load_recording
+from .smoothing import make_smoother
+
+MAX_LAG_FRAMES = 15
+
+# A punch found up to MATCH_BEFORE seconds before or MATCH_AFTER seconds after a labelled one is a hit
+MATCH_BEFORE = 0.3
+MATCH_AFTER = 0.15
+# Frames up to POSITIVE_LEAD seconds before a labelled punch are punching, for fitting.
+# Frames closer than NEGATIVE_MARGIN seconds to one but not punching are left out.
+POSITIVE_LEAD = 0.2
+NEGATIVE_MARGIN = 0.4
+
+
+def replay(frames, frame_size, classifier=None):
+    """Classify every frame of a recording. Returns a list of (timestamp, gesture)."""
+    if classifier is None:
+        classifier = GestureClassifier()
+    w, h = frame_size
+    gestures = []
+    for landmarks in frames:
+        for gesture in classifier.classify(landmarks, w, h):
+            gestures.append((landmarks.timestamp, gesture))
+    return gestures
+
+
+def measure_smoothing(frames, frame_size, smoother):
+    """
+    Run only the smoother over a recording and compare the smoothed hand
+    centers with the raw ones. Returns a dict with
+        lag_ms          delay of the smoothed track behind the raw one
+        jitter_px       RMS frame-to-frame change in velocity after smoothing
+        raw_jitter_px   the same before smoothing
+    or None if no hand was seen often enough.
+    """
+    w, h = frame_size
+    raw = ([], [])
+    smoothed = ([], [])
+    last_seen = [None, None]
+    for n, landmarks in enumerate(frames):
+        hand_index, first = np.unique(landmarks.hand_index, return_index=True)
+        if not len(hand_index):
+            continue
+        boxes = landmarks.boxes(w, h)[first].astype(np.float64)
+        for i, box in zip(hand_index, boxes):
+            if last_seen[i] != n - 1:
+                smoother.reset(i, box, landmarks.timestamp)
+            last_seen[i] = n
+        centers = box_centers(smoother.update(hand_index, boxes, landmarks.timestamp).copy())
+        for i, raw_center, center in zip(hand_index, box_centers(boxes), centers):
+            raw[i].append(raw_center)
+            smoothed[i].append(center)
+
+    lags, jitters, raw_jitters = [], [], []
+    for raw_track, track in zip(raw, smoothed):
+        if len(track) <= MAX_LAG_FRAMES + 2:
+            continue
+        raw_track, track = np.array(raw_track), np.array(track)
+        # The shift that lines the smoothed track up best with the raw one
+        errors = [np.abs(track[k:] - raw_track[:len(raw_track) - k]).mean() for k in range(MAX_LAG_FRAMES + 1)]
+        lags.append(int(np.argmin(errors)))
+        jitters.append(np.sqrt((np.diff(track, 2, axis=0) ** 2).sum(axis=1).mean()))
+        raw_jitters.append(np.sqrt((np.diff(raw_track, 2, axis=0) ** 2).sum(axis=1).mean()))
+    if not lags:
+        return None
+    timestamps = np.array([landmarks.timestamp for landmarks in frames])
+    frame_time = np.median(np.diff(timestamps)) if len(timestamps) > 1 else 0
+    return {
+        "lag_ms": float(np.mean(lags) * frame_time * 1000),
+        "jitter_px": float(np.mean(jitters)),
+        "raw_jitter_px": float(np.mean(raw_jitters)),
+    }
+
+
+def punch_times(gestures):
+    """Timestamps of the punches in a list of (timestamp, gesture), by punch gesture."""
+    return {name: np.array([t for t, gesture in gestures if gesture == name]) for name in PUNCH_GESTURES}
+
+
+def score_punches(found, expected):
+    """
+    Match the punches in found against the ones in expected, both lists of
+    (timestamp, gesture). Returns the number of hits, false punches and
+    missed punches, and how many seconds before its label every hit came.
+    """
+    hits = false = missed = 0
+    leads = []
+    found, expected = punch_times(found), punch_times(expected)
+    for name in PUNCH_GESTURES:
+        unmatched = np.ones(len(found[name]), dtype=bool)
+        for t in expected[name]:
+            near = (found[name] >= t - MATCH_BEFORE) & (found[name] <= t + MATCH_AFTER)
+            candidates = np.flatnonzero(unmatched & near)
+            if len(candidates):
+                unmatched[candidates[0]] = False
+                leads.append(t - found[name][candidates[0]])
+                hits += 1
+            else:
+                missed += 1
+        false += int(unmatched.sum())
+    return hits, false, missed, leads
+
+
+def describe_score(hits, false, missed, leads, frame_time):
+    precision = hits / max(hits + false, 1)
+    recall = hits / max(hits + missed, 1)
+    lead = np.mean(leads) if leads else 0.0
+    return (f"precision {precision:.2f}, recall {recall:.2f} ({hits} hits, {false} false, {missed} missed), "
+            f"{lead * 1000:+.0f} ms ({lead / frame_time if frame_time else 0:+.1f} frames) before the labels")
+
+
+def score_recordings(recordings, labels, classifiers):
+    """score_punches summed over recordings, a dict of path to (frames, frame_size), replayed with classifiers()."""
+    total = [0, 0, 0, []]
+    for path, (frames, frame_size) in recordings.items():
+        for n, value in enumerate(score_punches(replay(frames, frame_size, classifiers()), labels[path])):
+            total[n] += value
+    return total
+
+
+def frame_time_of(recordings):
+    """Median time between frames over all recordings."""
+    gaps = [np.diff([landmarks.timestamp for landmarks in frames]) for frames, _ in recordings if len(frames) > 1]
+    return float(np.median(np.concatenate(gaps))) if gaps else 0.0
+
+
+def punch_samples(frames, frame_size, labels, args, window=DEFAULT_WINDOW):
+    """
+    Feature rates of every hand the velocity detector could judge in every
+    frame of a recording, as they are at run time, with their labels: 1 for
+    frames leading up to a labelled punch of the hand, 0 for frames far from
+    any. Returns the rates and the labels.
+    """
+    classifier = make_classifier(args, VelocityPunchDetector(window=window))
+    classifier.punches = False
+    w, h = frame_size
+    expected = punch_times(labels)
+    rates, targets = [], []
+    for landmarks in frames:
+        classifier.classify(landmarks, w, h)
+        frame_rates, ready = classifier.punch_detector.rates()
+        for i in np.unique(landmarks.hand_index):
+            if not ready[i]:
+                continue
+            ahead = expected[PUNCH_GESTURES[i]] - landmarks.timestamp
+            if np.any((ahead >= 0) & (ahead <= POSITIVE_LEAD)):
+                targets.append(1)
+            elif np.all(np.abs(ahead) >= NEGATIVE_MARGIN):
+                targets.append(0)
+            else:
+                continue
+            rates.append(frame_rates[i].copy())
+    return np.array(rates).reshape(-1, len(FEATURES)), np.array(targets)
+
+
+def fit_punches(recordings, labels, args):
+    """
+    Fit the velocity detector's weights to the labelled punches, then move
+    its bias to where it finds them best on the recordings themselves.
+    Returns the best detector and its (hits, false, missed, leads) score.
+    """
+    samples = [punch_samples(frames, frame_size, labels[path], args)
+               for path, (frames, frame_size) in recordings.items()]
+    features = np.concatenate([rates for rates, _ in samples])
+    targets = np.concatenate([target for _, target in samples])
+    if not targets.any() or targets.all():
+        raise ValueError("Fitting needs frames with and without punches, record a session with some")
+    weights, bias = fit_logistic(features, targets)
+
+    # Try cut-offs across the scores of the punching frames
+    scores = features[targets == 1] @ weights + bias
+    best = None
+    for offset in np.unique(np.quantile(scores, np.linspace(0, 0.9, 19))):
+        detector_bias = bias - offset
+        total = score_recordings(recordings, labels,
+                                 lambda: make_classifier(args, VelocityPunchDetector(weights, detector_bias)))
+        hits, false, missed, leads = total
+        f1 = 2 * hits / max(2 * hits + false + missed, 1)
+        key = (f1, np.mean(leads) if leads else 0.0)
+        if best is None or key > best[0]:
+            best = key, VelocityPunchDetector(weights, detector_bias), total
+    return best[1], best[2]
+
+
+def save_punch_model(path, detector, score, recordings, labels_path):
+    hits, false, missed, leads = score
+    with open(path, "w") as f:
+        json.dump({
+            "features": list(FEATURES),
+            "window": detector.window,
+            "weights": detector.weights.tolist(),
+            "bias": detector.bias,
+            "recordings": list(recordings),
+            "labels": labels_path or "slope",
+            "precision": hits / max(hits + false, 1),
+            "recall": hits / max(hits + missed, 1),
+            "lead_ms": float(np.mean(leads) * 1000) if leads else 0.0,
+        }, f, indent=1)
+
+
+def make_smoother_from_args(args):
+    if args.damping is not None:
+        return make_smoother(f"exponential:alpha={args.damping}")
+    return make_smoother(args.smoothing)
+
+
+def punch_detector_spec(args):
+    """--punch-detector, or the slope heuristic if it was given a window or threshold."""
+    if args.slope_window is None and args.punch_threshold is None:
+        return args.punch_detector
+    window = args.slope_window if args.slope_window is not None else 5
+    threshold = args.punch_threshold if args.punch_threshold is not None else 600
+    return f"slope:window={window},threshold={threshold}"
+
+
+def make_classifier(args, punch_detector=None):
+    if punch_detector is None:
+        punch_detector = make_punch_detector(punch_detector_spec(args))
+    classifier = GestureClassifier(smoother=make_smoother_from_args(args), punch_detector=punch_detector)
+    if args.cooldown is not None:
+        classifier.set_cooldown(args.cooldown)
+    if args.cooldown_left is not None:
+        classifier.set_cooldown(args.cooldown_left, "left")
+    if args.cooldown_right is not None:
+        classifier.set_cooldown(args.cooldown_right, "right")
+    return classifier
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded landmarks through the gesture classifier.")
+    parser.add_argument("recordings", nargs="+", help=".npz files written by LandmarkRecorder")
+    parser.add_argument("--damping", type=float, help="exponential smoothing factor, overrides --smoothing")
+    parser.add_argument("--smoothing", help="smoother spec, see detection.smoothing")
+    parser.add_argument("--smoothing-report", action="store_true", help="print the lag and jitter of the smoother")
+    parser.add_argument("--punch-detector", help="punch detector spec, see detection.punches")
+    parser.add_argument("--punch-threshold", type=float, help="area slope that counts as a punch, implies slope")
+    parser.add_argument("--cooldown", type=float, help="punch cooldown of both hands in seconds")
+    parser.add_argument("--cooldown-left", type=float, help="punch cooldown of the left hand in seconds")
+    parser.add_argument("--cooldown-right", type=float, help="punch cooldown of the right hand in seconds")
+    parser.add_argument("--slope-window", type=int, help="frames in the punch slope window, implies slope")
+    parser.add_argument("--save", help="write the detected gestures to this JSON file")
+    parser.add_argument("--compare", help="fail if the gestures differ from this JSON file")
+    parser.add_argument("--labels", help="score the punches against this JSON file, as written by --save")
+    parser.add_argument("--fit-punches", help="fit the velocity punch detector and write its weights here")
+    args = parser.parse_args(argv)
+
+    recordings = {path: load_recording(path) for path in args.recordings}
+    labels = None
+    if args.labels:
+        with open(args.labels) as f:
+            labels = {path: [tuple(item) for item in gestures] for path, gestures in json.load(f).items()}
+        missing = [path for path in recordings if path not in labels]
+        if missing:
+            print(f"No labels for {', '.join(missing)} in {args.labels}")
+            return 1
+    frame_time = frame_time_of(recordings.values())
+
+    if args.fit_punches:
+        if labels is None:
+            # Learn to find what the slope heuristic finds
+            teacher = argparse.Namespace(**vars(args))
+            teacher.punch_detector = "slope"
+            labels = {path: replay(frames, frame_size, make_classifier(teacher))
+                      for path, (frames, frame_size) in recordings.items()}
+        detector, score = fit_punches(recordings, labels, args)
+        save_punch_model(args.fit_punches, detector, score, recordings, args.labels)
+        weights = ", ".join(f"{name} {weight:.3f}" for name, weight in zip(FEATURES, detector.weights))
+        print(f"Fitted {weights}, bias {detector.bias:.3f}, written to {args.fit_punches}")
+        print(f"Fitted velocity: {describe_score(*score, frame_time)}")
+        if args.labels:
+            slope = argparse.Namespace(**vars(args))
+            slope.punch_detector = "slope"
+            total = score_recordings(recordings, labels, lambda: make_classifier(slope))
+            print(f"Slope heuristic: {describe_score(*total, frame_time)}")
+        return 0
+
+    results = {}
+    reports = {}
+    total_frames = 0
+    start = time.perf_counter()
+    for path, (frames, frame_size) in recordings.items():
+        total_frames += len(frames)
+        results[path] = replay(frames, frame_size, make_classifier(args))
+        if args.smoothing_report:
+            reports[path] = measure_smoothing(frames, frame_size, make_smoother_from_args(args))
+    elapsed = time.perf_counter() - start
+
+    for path, gestures in results.items():
+        counts = collections.Counter(gesture for _, gesture in gestures)
+        print(f"{path}: " + ", ".join(f"{name}={count}" for name, count in sorted(counts.items())))
+    if labels is not None:
+        total = [0, 0, 0, []]
+        for path, gestures in results.items():
+            score = score_punches(gestures, labels[path])
+            print(f"{path}: {describe_score(*score, frame_time)}")
+            for n, value in enumerate(score):
+                total[n] += value
+        if len(results) > 1:
+            print(f"All recordings: {describe_score(*total, frame_time)}")
+    for path, report in reports.items():
+        if report is None:
+            print(f"{path}: not enough hand tracking to measure smoothing")
+        else:
+            print(f"{path}: lag {report['lag_ms']:.0f} ms, jitter {report['jitter_px']:.2f} px "
+                  f"(raw {report['raw_jitter_px']:.2f} px)")
+    print(f"{total_frames} frames in {elapsed:.2f}s ({total_frames / max(elapsed, 1e-9):.0f} frames/s)")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            expected = {path: [tuple(item) for item in gestures] for path, gestures in json.load(f).items()}
+        if expected != results:
+            print(f"Gestures differ from {args.compare}")
+            return 1
+        print(f"Gestures match {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Region-of-interest tracking for hand inference.
+Instead of the whole camera frame, only the area around the hands found
+in the previous frame is cropped, upsampled and handed to MediaPipe.
+"""
+
+
+class RegionOfInterest:
+    """
+    Keeps a crop box (x0, y0, x1, y1) in camera pixels around the last known
+    hands. The box is kept still while the hands stay well inside it, so
+    MediaPipe's own tracking sees a stable image. It falls back to the full
+    frame when the hands are lost and every refresh_interval frames, so a hand
+    entering somewhere else in the picture is still picked up.
+    """
+    def __init__(self, margin=0.5, edge=0.1, refresh_interval=15, aspect=4 / 3, min_fraction=0.3):
+        self.margin = margin  # Padding around the hands, relative to their size
+        self.edge = edge  # How close to the border the hands may get before the box moves
+        self.refresh_interval = refresh_interval
+        self.aspect = aspect  # Width / height of the crop, matches the model input
+        self.min_fraction = min_fraction  # Smallest crop, relative to the frame
+        self.box = None
+        self.frames_since_refresh = 0
+
+    def next_crop(self):
+        """Box to crop the next frame to, or None for the full frame."""
+        self.frames_since_refresh += 1
+        if self.box is None or self.frames_since_refresh >= self.refresh_interval:
+            self.frames_since_refresh = 0
+            return None
+        return self.box
+
+    def update(self, landmarks, w, h):
+        """Move the crop box to the hands of a LandmarkFrame in full frame coordinates."""
+        if not len(landmarks):
+            self.box = None
+            return
+
+        points = landmarks.points[..., :2].reshape(-1, 2)
+        x_min, y_min = points.min(axis=0) * (w, h)
+        x_max, y_max = points.max(axis=0) * (w, h)
+
+        if self.box is not None:
+            # Keep the current box while the hands stay clear of its edges
+            bx0, by0, bx1, by1 = self.box
+            edge_x, edge_y = (bx1 - bx0) * self.edge, (by1 - by0) * self.edge
+            if (bx0 + edge_x <= x_min and x_max <= bx1 - edge_x
+                    and by0 + edge_y <= y_min and y_max <= by1 - edge_y):
+                return
+
+        self.box = self.make_box(x_min, y_min, x_max, y_max, w, h)
+
+    def make_box(self, x_min, y_min, x_max, y_max, w, h):
+        """Pad the hands' bounding box, fix its aspect ratio and clamp it to the frame."""
+        box_w = max((x_max - x_min) * (1 + self.margin), w * self.min_fraction)
+        box_h = max((y_max - y_min) * (1 + self.margin), h * self.min_fraction)
+
+        # Grow the short side so the crop isn't stretched when resized
+        if box_w / box_h < self.aspect:
+            box_w = box_h * self.aspect
+        else:
+            box_h = box_w / self.aspect
+        box_w, box_h = min(box_w, w), min(box_h, h)
+
+        center_x, center_y = (x_min + x_max) / 2, (y_min + y_max) / 2
+        x0 = int(min(max(center_x - box_w / 2, 0), w - box_w))
+        y0 = int(min(max(center_y - box_h / 2, 0), h - box_h))
+        return x0, y0, x0 + int(box_w), y0 + int(box_h)
+
@@ -0,0 +1,69 @@
+"""
+Incremental least-squares slope over a sliding window of samples.
+"""
+
+import numpy as np
+
+
+class RollingSlope:
+    """
+    Slope of the least-squares line through the last `window` samples,
+    taken at x = 0, 1, ..., window - 1. Each push() is constant time: only
+    the running sums of y and x * y are updated. They are recomputed from
+    the window every time the ring buffer wraps around, so rounding errors
+    can't pile up over a long session.
+    """
+    def __init__(self, window=5):
+        if window < 2:
+            raise ValueError("RollingSlope needs a window of at least 2 samples")
+        self.window = window
+        self.samples = np.zeros(window)
+        self.count = 0
+        self.index = 0  # Slot the next sample goes to, also the oldest sample
+        self.sum_y = 0.0
+        self.sum_xy = 0.0
+
+        # Constant parts of the least-squares formula
+        x = np.arange(window)
+        self.sum_x = x.sum()
+        self.denominator = window * (x * x).sum() - self.sum_x ** 2
+
+    @property
+    def ready(self):
+        """True once the window is full."""
+        return self.count >= self.window
+
+    def reset(self):
+        self.count = 0
+        self.index = 0
+        self.sum_y = 0.0
+        self.sum_xy = 0.0
+
+    def push(self, y):
+        """Add a sample, dropping the oldest one once the window is full."""
+        if self.count < self.window:
+            self.sum_xy += self.count * y
+            self.sum_y += y
+            self.count += 1
+        else:
+            oldest = self.samples[self.index]
+            # Every remaining sample moves one step to the left
+            self.sum_xy += (self.window - 1) * y - (self.sum_y - oldest)
+            self.sum_y += y - oldest
+        self.samples[self.index] = y
+        self.index = (self.index + 1) % self.window
+
+        if self.index == 0:
+            self.resync()
+
+    def resync(self):
+        """Recompute the running sums, only valid right after the buffer wrapped."""
+        self.sum_y = self.samples.sum()
+        self.sum_xy = (np.arange(self.window) * self.samples).sum()
+
+    @property
+    def slope(self):
+        """Slope over the full window, 0 until the window has filled up."""
+        if not self.ready:
+            return 0.0
+        return (self.window * self.sum_xy - self.sum_x * self.sum_y) / self.denominator
@@ -0,0 +1,164 @@
+"""
+Smoothing of the hand boxes between frames.
+The classifier decides columns and punches on smoothed boxes; how they are
+smoothed is up to one of these filters, all working on the x_min, y_min,
+x_max, y_max of both hands at once:
+    exponential     fixed blend towards each new box, the original behaviour
+    one-euro        low-pass whose cutoff rises with speed, so slow hands
+                    are steady and fast ones follow with little lag
+    kalman          constant-velocity Kalman filter per coordinate
+
+Every parameter takes either one value or an (x, y) pair to tune the
+horizontal and vertical axes separately. Filters are picked with a spec
+string, usually from the REBOX_SMOOTHING environment variable:
+    exponential:alpha=0.15
+    one-euro:min_cutoff=1.0,beta=0.01
+    kalman:process_noise=2e5/5e4,measurement_noise=25
+"""
+
+import numpy as np
+
+DEFAULT_SMOOTHING = "exponential"
+DEFAULT_DT = 1 / 30  # Seconds assumed between frames with no usable timestamps
+
+
+def _per_axis(value):
+    """Spread a value or an (x, y) pair over the x_min, y_min, x_max, y_max columns."""
+    value = np.asarray(value, dtype=np.float64)
+    if value.shape == (2,):
+        return np.tile(value, 2)
+    return np.full(4, float(value))
+
+
+class _Smoother:
+    """Per hand bookkeeping shared by the filters: the smoothed boxes and when each hand was last seen."""
+    def __init__(self):
+        self.boxes = np.zeros((2, 4))
+        self.last_time = np.zeros(2)
+
+    def reset(self, i, box, timestamp):
+        """Start hand i over at box, with no motion."""
+        self.boxes[i] = box
+        self.last_time[i] = timestamp
+
+    def elapsed(self, hand_index, timestamp):
+        dt = timestamp - self.last_time[hand_index]
+        self.last_time[hand_index] = timestamp
+        return np.where(dt > 0, dt, DEFAULT_DT)[:, None]
+
+    def update(self, hand_index, boxes, timestamp):
+        """Filter the new boxes of the hands in hand_index. Returns their smoothed boxes."""
+        raise NotImplementedError
+
+
+class ExponentialSmoother(_Smoother):
+    """Moves a fraction alpha of the way towards every new box."""
+    def __init__(self, alpha=0.15):
+        _Smoother.__init__(self)
+        self.alpha = _per_axis(alpha)
+
+    def update(self, hand_index, boxes, timestamp):
+        self.last_time[hand_index] = timestamp
+        self.boxes[hand_index] += (boxes - self.boxes[hand_index]) * self.alpha
+        return self.boxes[hand_index]
+
+
+class OneEuroFilter(_Smoother):
+    """
+    The One Euro filter (Casiez et al. 2012). min_cutoff in Hz sets the
+    smoothing of a hand at rest, beta how fast the cutoff climbs with speed
+    in pixels per second, d_cutoff the smoothing of that speed estimate.
+    """
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0):
+        _Smoother.__init__(self)
+        self.min_cutoff = _per_axis(min_cutoff)
+        self.beta = _per_axis(beta)
+        self.d_cutoff = _per_axis(d_cutoff)
+        self.speed = np.zeros((2, 4))
+
+    @staticmethod
+    def alpha(cutoff, dt):
+        tau = 1 / (2 * np.pi * cutoff)
+        return 1 / (1 + tau / dt)
+
+    def reset(self, i, box, timestamp):
+        _Smoother.reset(self, i, box, timestamp)
+        self.speed[i] = 0
+
+    def update(self, hand_index, boxes, timestamp):
+        dt = self.elapsed(hand_index, timestamp)
+        previous = self.boxes[hand_index]
+        speed = self.speed[hand_index]
+        speed += ((boxes - previous) / dt - speed) * self.alpha(self.d_cutoff, dt)
+        cutoff = self.min_cutoff + self.beta * np.abs(speed)
+        self.speed[hand_index] = speed
+        self.boxes[hand_index] = previous + (boxes - previous) * self.alpha(cutoff, dt)
+        return self.boxes[hand_index]
+
+
+class KalmanSmoother(_Smoother):
+    """
+    Constant-velocity Kalman filter, run independently on every coordinate.
+    process_noise is the variance of the acceleration in pixels²/s⁴, how
+    freely the hand is expected to change speed; measurement_noise the
+    variance of MediaPipe's boxes in pixels².
+    """
+    def __init__(self, process_noise=2e5, measurement_noise=25):
+        _Smoother.__init__(self)
+        self.process_noise = _per_axis(process_noise)
+        self.measurement_noise = _per_axis(measurement_noise)
+        self.velocity = np.zeros((2, 4))
+        # Covariance of position and velocity of every coordinate: pp, pv, vv
+        self.covariance = np.zeros((3, 2, 4))
+
+    def reset(self, i, box, timestamp):
+        _Smoother.reset(self, i, box, timestamp)
+        self.velocity[i] = 0
+        self.covariance[:, i] = 0
+        self.covariance[0, i] = self.measurement_noise
+
+    def update(self, hand_index, boxes, timestamp):
+        dt = self.elapsed(hand_index, timestamp)
+        q = self.process_noise
+        position = self.boxes[hand_index]
+        velocity = self.velocity[hand_index]
+        pp, pv, vv = self.covariance[:, hand_index]
+
+        # Predict
+        position = position + velocity * dt
+        pp = pp + dt * (2 * pv + dt * vv) + q * dt ** 4 / 4
+        pv = pv + dt * vv + q * dt ** 3 / 2
+        vv = vv + q * dt ** 2
+
+        # Correct with the measured box
+        gain_p = pp / (pp + self.measurement_noise)
+        gain_v = pv / (pp + self.measurement_noise)
+        residual = boxes - position
+        position = position + gain_p * residual
+        velocity = velocity + gain_v * residual
+        pp, pv, vv = (1 - gain_p) * pp, (1 - gain_p) * pv, vv - gain_v * pv
+
+        self.boxes[hand_index] = position
+        self.velocity[hand_index] = velocity
+        self.covariance[:, hand_index] = pp, pv, vv
+        return self.boxes[hand_index]
+
+
+SMOOTHERS = {
+    "exponential": ExponentialSmoother,
+    "one-euro": OneEuroFilter,
+    "kalman": KalmanSmoother,
+}
+
+
+def make_smoother(spec=None):
+    """Build the smoother described by spec, see the module docstring."""
+    kind, _, arguments = (spec or DEFAULT_SMOOTHING).partition(":")
+    if kind not in SMOOTHERS:
+        raise ValueError(f"Unknown smoothing {spec!r}")
+    kwargs = {}
+    for argument in filter(None, arguments.split(",")):
+        key, _, value = argument.partition("=")
+        values = [float(v) for v in value.split("/")]
+        kwargs[key.strip()] = values[0] if len(values) == 1 else values
+    return SMOOTHERS[kind](**kwargs)
@@ -0,0 +1,207 @@
+"""
+Out-of-process hand detection.
+Capture and MediaPipe inference run in a separate process so they never
+compete with the pygame loop for the GIL. Only gestures come back, over a
+queue as small (gestures, captured_at, inferred_at, classified_at) tuples,
+one per frame that had any. The warm-up progress, the health of the frame
+source and the number of frames read and dropped are kept in shared values,
+as is the error that stopped the backend from loading, if any.
+"""
+
+import multiprocessing
+import queue
+import threading
+
+from .capture import HEALTH_STATES
+from .classifier import DEFAULT_COOLDOWN
+
+
+def run_worker(events, control, stop_event, pause_event, progress, health, frame_counts, error, source, roi,
+               record_path, smoothing, backend, motion_gate, punch_detector, cooldowns):
+    """
+    Entry point of the detection process. The backend is warmed up first,
+    with its progress from 0 to 1 kept in the shared progress value. The
+    frame source's health goes into health, as an index of HEALTH_STATES,
+    the frames read and dropped so far into frame_counts. If the backend
+    can't be created or warmed up, what went wrong goes into error and the
+    process exits. While pause_event is set the frame source is closed and
+    no inference runs. DetectionProfiles sent over control are applied to
+    the pipeline.
+    """
+    import time
+
+    from .backends import create_backend
+    from .capture import HEALTH_OK, CaptureSupervisor, FrameGrabber
+    from .classifier import GestureClassifier
+    from .frame_source import open_source
+    from .pipeline import BACKEND_PROGRESS, DetectionPipeline
+    from .profiles import input_sizes
+    from .punches import make_punch_detector
+    from .recorder import LandmarkRecorder
+    from .smoothing import make_smoother
+
+    def set_progress(value):
+        progress.value = value
+
+    def set_health(value):
+        health.value = HEALTH_STATES.index(value)
+
+    recorder = LandmarkRecorder(record_path) if record_path else None
+    try:
+        classifier = GestureClassifier(smoother=make_smoother(smoothing),
+                                       punch_detector=make_punch_detector(punch_detector), cooldowns=cooldowns)
+        pipeline = DetectionPipeline(create_backend(backend), classifier, roi=roi, recorder=recorder,
+                                     motion_gate=motion_gate)
+        set_progress(BACKEND_PROGRESS)
+        pipeline.warm_up(input_sizes(), progress=set_progress, keep_going=lambda: not stop_event.is_set())
+    except Exception as e:
+        error.value = f"{type(e).__name__}: {e}".encode(errors="replace")[:len(error) - 1]
+        return
+    grabber = None
+    try:
+        while not stop_event.is_set():
+            if pause_event.is_set():
+                if grabber is not None:
+                    grabber.stop()
+                    grabber.release()
+                    grabber = None
+                stop_event.wait(0.1)
+                continue
+            if grabber is None:
+                grabber = FrameGrabber(open_source(source), reopen=lambda: open_source(source),
+                                       supervisor=CaptureSupervisor(on_health=set_health))
+                set_health(HEALTH_OK)
+                grabber.start()
+            while not control.empty():
+                pipeline.apply_profile(control.get())
+
+            started_at = time.monotonic()
+            dropped = grabber.dropped
+            frame, captured_at = grabber.latest(timeout=0.5)
+            if frame is None:
+                continue
+            frame_counts[0] += 1
+            frame_counts[1] += grabber.dropped - dropped
+            gestures = pipeline.process(frame, captured_at)
+
+            if gestures:
+                try:
+                    # The relay thread drains the queue right away, so this only
+                    # blocks if the game side is gone
+                    events.put((gestures, pipeline.landmarks.timestamp, pipeline.inferred_at,
+                                pipeline.classified_at), timeout=1)
+                except queue.Full:
+                    pass
+            pipeline.throttle(started_at)
+    finally:
+        if grabber is not None:
+            grabber.stop()
+            grabber.release()
+        if recorder is not None:
+            recorder.save()
+
+
+class DetectionWorker:
+    """
+    Game-side handle of the detection process. Relays gestures coming back
+    from the worker to on_gesture.
+    """
+    def __init__(self, on_gesture, source=None, roi=False, record_path=None, smoothing=None, backend=None,
+                 motion_gate=False, punch_detector=None, cooldowns=(DEFAULT_COOLDOWN, DEFAULT_COOLDOWN),
+                 on_progress=None, on_health=None, on_frames=None, on_error=None):
+        self.on_gesture = on_gesture
+        self.on_progress = on_progress  # Called with the warm-up progress, from 0 to 1
+        self.on_health = on_health  # Called with the frame source's health when it changes
+        self.on_frames = on_frames  # Called with the number of new frames read and dropped
+        self.on_error = on_error  # Called with what went wrong if the worker dies, it won't be restarted
+        self.source = source  # Frame source spec, see frame_source.open_source
+        self.roi = roi
+        self.record_path = record_path  # Save the landmark stream here if set
+        self.smoothing = smoothing  # Smoother spec, see smoothing.make_smoother
+        self.backend = backend  # Hand backend spec, see backends.create_backend
+        self.motion_gate = motion_gate  # Skip inference on still frames
+        self.punch_detector = punch_detector  # Punch detector spec, see punches.make_punch_detector
+        self.cooldowns = cooldowns  # Punch cooldowns of the left and right hand in seconds
+        self.context = multiprocessing.get_context("spawn")
+        self.events = self.context.Queue(maxsize=64)
+        self.control = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.pause_event = self.context.Event()
+        self.progress = self.context.Value("d", 0.0)
+        self.health = self.context.Value("i", 0)
+        self.frame_counts = self.context.Array("q", 2)  # Frames read, frames dropped
+        self.error = self.context.Array("c", 256)  # Why the backend failed to load, empty while it hasn't
+        self.process = None
+        self.relay_thread = None
+
+    def start(self):
+        """Start the worker process."""
+        if self.process is not None:
+            return
+        self.stop_event.clear()
+        self.process = self.context.Process(
+            target=run_worker,
+            args=(self.events, self.control, self.stop_event, self.pause_event, self.progress,
+                  self.health, self.frame_counts, self.error, self.source, self.roi, self.record_path, self.smoothing, self.backend,
+                  self.motion_gate, self.punch_detector, self.cooldowns),
+            daemon=True)
+        self.process.start()
+
+        self.relay_thread = threading.Thread(target=self.relay, args=(self.process,), daemon=True)
+        self.relay_thread.start()
+
+    def set_profile(self, profile):
+        """Send a DetectionProfile to the worker."""
+        self.control.put(profile)
+
+    def pause(self):
+        """Have the worker close its frame source and stop inference."""
+        self.pause_event.set()
+
+    def resume(self):
+        self.pause_event.clear()
+
+    def stop(self):
+        """Stop the worker process."""
+        if self.process is None:
+            return
+        self.stop_event.set()
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
+        if self.relay_thread is not None:
+            self.relay_thread.join(timeout=1)
+            self.relay_thread = None
+
+    def relay(self, process):
+        reported = None
+        reported_health = 0
+        reported_frames = (0, 0)
+        while not self.stop_event.is_set():
+            # Keep an eye on the warm-up until it is done
+            progress = self.progress.value
+            if progress != reported and self.on_progress is not None:
+                self.on_progress(progress)
+                reported = progress
+            health = self.health.value
+            if health != reported_health and self.on_health is not None:
+                self.on_health(HEALTH_STATES[health])
+                reported_health = health
+            frames = tuple(self.frame_counts)
+            if frames != reported_frames and self.on_frames is not None:
+                self.on_frames(frames[0] - reported_frames[0], frames[1] - reported_frames[1])
+                reported_frames = frames
+            if not process.is_alive():
+                # Died on its own, stop() sets stop_event before joining
+                if self.on_error is not None and not self.stop_event.is_set():
+                    error = self.error.value.decode(errors="replace")
+                    self.on_error(error or f"Detection process exited with code {process.exitcode}")
+                return
+            try:
+                gestures, captured_at, inferred_at, classified_at = self.events.get(
+                    timeout=0.5 if reported == 1 else 0.05)
+            except queue.Empty:
+                continue
+            for gesture in gestures:
+                self.on_gesture(gesture, captured_at, inferred_at, classified_at)
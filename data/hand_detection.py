@@ -1,138 +1,321 @@
-import mediapipe as mp
-import cv2
-from scipy.stats import linregress
-import numpy as np
+import atexit
+import os
 import time
 import threading
-# Initialize Mediapipe Hands
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5)
 
-# Variables for smoothing hand positions
-left_hand_positions = [np.array([0, 0]), np.array([0, 0])]
-right_hand_positions = [np.array([0, 0]), np.array([0, 0])]
-damping_factor = 0.15
-cap = cv2.VideoCapture(0)
+import pygame as pg
 
-# Track areas for detecting punches
-hands_area = [[], []]
+from .detection import profiles
+from .detection.backends import DEFAULT_BACKEND, create_backend
+from .detection.capture import HEALTH_OK, CaptureSupervisor, FrameGrabber
+from .detection.classifier import DEFAULT_COOLDOWN, GestureClassifier
+from .detection.frame_source import DEFAULT_SOURCE, open_source
+from .detection.latency import LatencyStats
+from .detection.pipeline import BACKEND_PROGRESS, DetectionPipeline
+from .detection.punches import DEFAULT_PUNCH_DETECTOR, make_punch_detector
+from .detection.recorder import LandmarkRecorder
+from .detection.smoothing import DEFAULT_SMOOTHING, make_smoother
+from .detection.worker import DetectionWorker
 
-# Cooldown tracking
-cooldown_time = 1 # Cooldown duration in seconds
-last_punch_time = {"left": 0, "right": 0}
+# Custom pygame event carrying a detected gesture. Posted from the detection
+# thread and routed by tools.Control.event_loop to the active state only.
+GESTURE = pg.event.custom_type()
 
-previous_column = {"Left": "middle", "Right": "middle"}
+# Posted while the detector warms up, with its progress from 0 to 1 and
+# whether it is ready, so loading screens can show real progress. error is
+# set, and ready never will be, if the backend failed to load or warm up.
+DETECTOR_READINESS = pg.event.custom_type()
 
-gesture_lock = threading.Lock()
-current_gesture = None
+# Posted when the frame source starts failing, gets lost or comes back,
+# with its health (see detection.capture) and whether it is healthy.
+DETECTOR_HEALTH = pg.event.custom_type()
 
-def detect_punch():
+# "thread" runs detection inside the game process, "process" moves capture
+# and MediaPipe inference to a separate worker process.
+DETECTION_MODE = os.environ.get("REBOX_DETECTION_MODE", "thread")
+
+# Only run inference on a crop around the hands of the previous frame
+USE_ROI = os.environ.get("REBOX_DETECTION_ROI", "0") == "1"
+
+# Skip inference on frames in which nothing moved, see detection.motion
+USE_MOTION_GATE = os.environ.get("REBOX_MOTION_GATE", "1") == "1"
+
+# Where frames come from: the webcam, a video, a directory of images or a
+# synthetic generator, see detection.frame_source
+FRAME_SOURCE = os.environ.get("REBOX_FRAME_SOURCE", DEFAULT_SOURCE)
+
+# Record every frame's landmarks to this .npz file, for detection.replay
+RECORD_PATH = os.environ.get("REBOX_RECORD_LANDMARKS")
+
+# What finds hand landmarks: the legacy MediaPipe Hands or the Tasks
+# HandLandmarker, see detection.backends
+HAND_BACKEND = os.environ.get("REBOX_HAND_BACKEND", DEFAULT_BACKEND)
+
+# How hand boxes are smoothed between frames, see detection.smoothing
+SMOOTHING = os.environ.get("REBOX_SMOOTHING", DEFAULT_SMOOTHING)
+
+# What decides a hand is punching, see detection.punches
+PUNCH_DETECTOR = os.environ.get("REBOX_PUNCH_DETECTOR", DEFAULT_PUNCH_DETECTOR)
+
+# Minimum time between two punches of the left and of the right hand, in seconds
+PUNCH_COOLDOWN_LEFT = float(os.environ.get("REBOX_PUNCH_COOLDOWN_LEFT", DEFAULT_COOLDOWN))
+PUNCH_COOLDOWN_RIGHT = float(os.environ.get("REBOX_PUNCH_COOLDOWN_RIGHT", DEFAULT_COOLDOWN))
+
+# Where the gesture latency percentiles are written, with F4 or on exit
+LATENCY_DUMP_PATH = os.environ.get("REBOX_LATENCY_DUMP")
+
+# Capture-to-consumption latency of every gesture the player acts on
+latency_stats = LatencyStats()
+
+
+def post_gesture(gesture, captured_at=None, inferred_at=None, classified_at=None):
     """
-    Detect punches based on hand movement slopes.
-    Returns 'punch_left', 'punch_right', or None.
+    Publish a gesture as a GESTURE event stamped with the monotonic time
+    it was posted at, the time its camera frame was captured and the times
+    inference and classification of that frame finished.
     """
-    global left_hand_positions, right_hand_positions, hands_area, previous_column, current_gesture
-
-    success, frame = cap.read()
-    if not success:
-        return None
-
-    target_width = 640
-    target_height = 480
-    frame_resized = cv2.resize(frame, (target_width, target_height))
-
-    # Convert frame to RGB
-    img_rgb = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
-    results = hands.process(img_rgb)
-
-    h, w, _ = frame.shape
-    column_width = w // 3
-
-    if results.multi_hand_landmarks:
-        for hand_id, hand_landmarks in enumerate(results.multi_hand_landmarks):
-            x_list, y_list = [], []
-            for lm in hand_landmarks.landmark:
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                x_list.append(cx)
-                y_list.append(cy)
-
-            x_min, x_max = min(x_list), max(x_list)
-            y_min, y_max = min(y_list), max(y_list)
-
-            top_left = np.array([x_min, y_min])
-            bottom_right = np.array([x_max, y_max])
-
-            handedness = results.multi_handedness[hand_id].classification[0].label
-            hand_positions = left_hand_positions if handedness == "Left" else right_hand_positions
-            hand_index = 0 if handedness == "Left" else 1
-
-            # Smooth position updates
-            current_top_left = hand_positions[0] + (top_left - hand_positions[0]) * damping_factor
-            current_bottom_right = hand_positions[1] + (bottom_right - hand_positions[1]) * damping_factor
-
-            # Update hand positions
-            hand_positions[0] = current_top_left
-            hand_positions[1] = current_bottom_right
-
-            # Calculate hand area
-            hand_width = current_bottom_right[0] - current_top_left[0]
-            hand_height = current_bottom_right[1] - current_top_left[1]
-            hands_area[hand_index].append(hand_width * hand_height)
-
-
-            # Detect column based on hand position (cx)
-            hand_center_x = int((current_top_left[0] + current_bottom_right[0]) / 2)
-            if hand_center_x < column_width:
-                current_column = "right"
-            elif hand_center_x < 2 * column_width:
-                current_column = "middle"
-            else:
-                current_column = "left"
-
-            # Trigger movement if column changes
-            if current_column != previous_column[handedness]:
-                previous_column[handedness] = current_column
-                with gesture_lock:
-                    current_gesture = f"move_{current_column}"
-                    return
-
-    current_time = int(time.time())
-    # Check punch movement using slope
-    if len(hands_area[0]) >= 5 and len(hands_area[1]) >= 5:
-        left_slopes = linregress(range(5), hands_area[0][-5:]).slope
-        right_slopes = linregress(range(5), hands_area[1][-5:]).slope
-
-        hands_area[0] = hands_area[0][-5:]
-        hands_area[1] = hands_area[1][-5:]
-
-        if left_slopes > 600 and current_time - last_punch_time["left"] > cooldown_time:
-            last_punch_time["left"] = current_time
-            with gesture_lock:
-                current_gesture = "punch_right"
-                return
+    timestamp = time.monotonic()
+    if captured_at is None:
+        captured_at = timestamp
+    if inferred_at is None:
+        inferred_at = captured_at
+    if classified_at is None:
+        classified_at = timestamp
+    event = pg.event.Event(GESTURE, gesture=gesture, timestamp=timestamp, captured_at=captured_at,
+                           inferred_at=inferred_at, classified_at=classified_at)
+    try:
+        pg.event.post(event)
+    except pg.error:
+        # The display is not up yet (or already gone), nobody to deliver to.
+        pass
+
 
-        # Right hand punch
-        elif right_slopes > 600 and current_time - last_punch_time["right"] > cooldown_time:
-            last_punch_time["right"] = current_time
-            with gesture_lock:
-                current_gesture = "punch_left"
+def post_readiness(progress, error=None):
+    """Publish the detector's warm-up progress, or why it failed, as a DETECTOR_READINESS event."""
+    try:
+        pg.event.post(pg.event.Event(DETECTOR_READINESS, progress=progress, ready=progress >= 1 and error is None,
+                                     error=error))
+    except pg.error:
+        pass
+
+
+def post_health(health):
+    """Publish the frame source's health as a DETECTOR_HEALTH event."""
+    try:
+        pg.event.post(pg.event.Event(DETECTOR_HEALTH, health=health, healthy=health == HEALTH_OK))
+    except pg.error:
+        pass
+
+
+class HandDetector:
+    """
+    Owns the detection pipeline and whatever runs it: one thread in the game
+    process for the detector's whole life, or the worker process in "process"
+    mode. Nothing is opened until start(). pause() closes the frame source
+    and stops inference, resume() picks it back up; the MediaPipe graph is
+    kept in between. Neither of them waits for the detection thread.
+    How fast and how thoroughly it works follows the current DetectionProfile.
+
+    The backend is created and warmed up with dummy frames in the background
+    right after start(). progress goes from 0 to 1 meanwhile, ready is set
+    once it is done and every step is posted as a DETECTOR_READINESS event.
+    If that fails, error holds what went wrong, it is posted the same way
+    and the detector stays idle until stopped.
+
+    Failing reads back off and reopen the frame source instead of retrying
+    flat out, health follows it and changes are posted as DETECTOR_HEALTH.
+    """
+    def __init__(self, mode=DETECTION_MODE, source=FRAME_SOURCE, roi=USE_ROI, record_path=RECORD_PATH,
+                 smoothing=SMOOTHING, backend=HAND_BACKEND, motion_gate=USE_MOTION_GATE,
+                 punch_detector=PUNCH_DETECTOR, cooldowns=(PUNCH_COOLDOWN_LEFT, PUNCH_COOLDOWN_RIGHT)):
+        self.mode = mode
+        self.source = source
+        self.roi = roi
+        self.record_path = record_path
+        self.smoothing = smoothing
+        self.punch_detector = punch_detector
+        self.cooldowns = cooldowns
+        self.backend = backend
+        self.motion_gate = motion_gate
+        self.started = False
+        self.paused = False
+        self.profile = profiles.FIGHT
+        self.worker = None
+        self.pipeline = None
+        self.thread = None
+        self.resumed = threading.Event()  # Set while detection should run
+        self.latency = latency_stats
+        self.progress = 0.0
+        self.ready = False
+        self.error = None
+        self.health = HEALTH_OK
+        # Does nothing unless started, registered once however often the detector is restarted
+        atexit.register(self.stop)
+
+    def start(self):
+        """Build the pipeline and start detecting."""
+        if self.started:
+            return
+        self.started = True
+        self.paused = False
+        if self.mode == "process":
+            # Capture and inference live in the worker, only gestures come back
+            self.worker = DetectionWorker(on_gesture=post_gesture, source=self.source, roi=self.roi,
+                                          record_path=self.record_path, smoothing=self.smoothing,
+                                          backend=self.backend, motion_gate=self.motion_gate,
+                                          punch_detector=self.punch_detector, cooldowns=self.cooldowns,
+                                          on_progress=self.report_progress,
+                                          on_health=self.report_health, on_frames=self.latency.count_frames,
+                                          on_error=self.report_error)
+            self.worker.start()
+            self.worker.set_profile(self.profile)
+        else:
+            self.resumed.set()
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def report_progress(self, progress):
+        self.progress = progress
+        if progress >= 1:
+            self.ready = True
+        post_readiness(progress)
+
+    def report_error(self, error):
+        self.error = error
+        print(f"Hand detection failed: {error}")
+        post_readiness(self.progress, error)
+
+    def report_health(self, health):
+        if health == self.health:
+            return
+        self.health = health
+        post_health(health)
+
+    def build_pipeline(self, recorder=None):
+        """
+        Create the backend and warm it up, on the detection thread, with
+        every frame's landmarks going to recorder. Reports an error if it fails.
+        """
+        self.report_progress(0.0)
+        hands = None
+        try:
+            hands = create_backend(self.backend)
+            if not self.started:
+                hands.close()
                 return
+            self.report_progress(BACKEND_PROGRESS)
+            classifier = GestureClassifier(smoother=make_smoother(self.smoothing),
+                                           punch_detector=make_punch_detector(self.punch_detector),
+                                           cooldowns=self.cooldowns)
+            pipeline = DetectionPipeline(hands, classifier, roi=self.roi, recorder=recorder,
+                                         motion_gate=self.motion_gate)
+            pipeline.warm_up(profiles.input_sizes(), progress=self.report_progress, keep_going=lambda: self.started)
+        except Exception as e:
+            if hands is not None:
+                hands.close()
+            self.report_error(f"{type(e).__name__}: {e}")
+            return
+        if not self.started:
+            hands.close()
+            return
+        pipeline.apply_profile(self.profile)
+        self.pipeline = pipeline
+
+    def set_profile(self, profile):
+        """Switch to another DetectionProfile, takes effect from the next frame."""
+        if profile is self.profile:
+            return
+        self.profile = profile
+        if self.worker is not None:
+            self.worker.set_profile(profile)
+        elif self.pipeline is not None:
+            self.pipeline.apply_profile(profile)
 
-    current_gesture = None
+    def pause(self):
+        """Release the frame source and stop inference until resume()."""
+        if not self.started or self.paused:
+            return
+        self.resumed.clear()
+        self.paused = True
+        if self.worker is not None:
+            self.worker.pause()
+        # The detection thread notices on its own, closes the source and waits for resume()
 
+    def resume(self):
+        if not self.started or not self.paused:
+            return
+        self.paused = False
+        if self.worker is not None:
+            self.worker.resume()
+        self.resumed.set()
 
-def start_hand_detection():
-    while True:
-        detect_punch()
+    def stop(self):
+        """Stop detecting for good and release everything."""
+        if not self.started:
+            return
+        self.started = False
+        self.paused = True
+        # Wake a paused detection thread so it can finish
+        self.resumed.set()
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+        if self.thread is not None:
+            # The thread closes the pipeline and saves the recording on its way out
+            self.thread.join(timeout=2)
+            self.thread = None
+        if LATENCY_DUMP_PATH and self.latency.count:
+            self.latency.dump(LATENCY_DUMP_PATH)
 
+    def run(self):
+        """Detection thread: builds the pipeline, then detects whenever it isn't paused until stopped."""
+        # Only this thread touches the recorder
+        recorder = LandmarkRecorder(self.record_path) if self.record_path else None
+        try:
+            self.build_pipeline(recorder)
+            while self.pipeline is not None and self.started:
+                self.resumed.wait()
+                if self.started:
+                    self.detect_until_paused()
+        finally:
+            if self.pipeline is not None:
+                self.pipeline.hands.close()
+                self.pipeline = None
+            if recorder is not None:
+                recorder.save()
 
-def get_detected_gesture():
-    global current_gesture
-    time.sleep(0.01)
-    with gesture_lock:
-        return current_gesture
+    def detect_until_paused(self):
+        """Open the frame source and run detection on it until paused or stopped."""
+        # Read the camera on its own thread, detection always takes the newest frame
+        grabber = FrameGrabber(open_source(self.source), reopen=lambda: open_source(self.source),
+                               supervisor=CaptureSupervisor(on_health=self.report_health))
+        # A freshly opened source gets the benefit of the doubt
+        self.report_health(HEALTH_OK)
+        grabber.start()
+        try:
+            while self.started and not self.paused:
+                started_at = time.monotonic()
+                self.detect_punch(grabber)
+                self.pipeline.throttle(started_at)
+        finally:
+            grabber.stop()
+            grabber.release()
 
+    def detect_punch(self, grabber):
+        """
+        Run the newest frame from grabber through the detection pipeline.
+        Posts a GESTURE event for every 'move_*', 'punch_left' or 'punch_right'
+        in it, in order, and returns them.
+        """
+        dropped = grabber.dropped
+        frame, captured_at = grabber.latest(timeout=1)
+        if frame is None:
+            return []
+        self.latency.count_frames(1, grabber.dropped - dropped)
 
-# Run hand detection in a separate thread
-hand_detection_thread = threading.Thread(target=start_hand_detection, daemon=True)
-hand_detection_thread.start()
+        gestures = self.pipeline.process(frame, captured_at)
+        # With an asynchronous backend the gestures can come from an earlier frame
+        captured_at = self.pipeline.landmarks.timestamp
+        for gesture in gestures:
+            post_gesture(gesture, captured_at, self.pipeline.inferred_at, self.pipeline.classified_at)
+        return gestures
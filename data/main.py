@@ -4,14 +4,17 @@ tools.Control and adds the game states to its state_machine dictionary.
 """
 
 import pygame as pg
-from . import prepare, tools
+from . import prepare, tools, hand_detection
 from .states import splash, title, game, select, game_over, victory, loading, enemey_select
 
 
 def main():
     pg.init()
 
-    app = tools.Control(prepare.ORIGINAL_CAPTION)
+    detector = hand_detection.HandDetector()
+    detector.start()
+
+    app = tools.Control(prepare.ORIGINAL_CAPTION, detector)
     pg.display.set_icon(prepare.ICON_IMAGE)
     # Set up the state dictionary
     state_dict = {
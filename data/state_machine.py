@@ -2,17 +2,24 @@
 A generalized state machine for general program flow.
 """
 
+from .detection import profiles
+
 
 class StateMachine(object):
     """
     A generic state machine.
+    If given a hand detector, it runs with the detection profile of the
+    active state, and is paused while the window doesn't have focus or the
+    state has no profile.
     """
-    def __init__(self):
+    def __init__(self, detector=None):
         self.done = False
         self.state_dict = {}
         self.state_name = None
         self.state = None
         self.now = None
+        self.detector = detector
+        self.focused = True
 
     def setup_states(self, state_dict, start_state):
         """
@@ -23,6 +30,7 @@ class StateMachine(object):
         self.state_name = start_state
         self.state = self.state_dict[self.state_name]
         self.state.persist = {}
+        self.update_detection()
 
     def update(self, keys, now):
         """
@@ -52,6 +60,22 @@ class StateMachine(object):
         print(f"Persist data before state transition: {persist}")
         self.state.startup(self.now, self.state.persist)
         self.state.previous = previous
+        self.update_detection()
+
+    def set_focus(self, focused):
+        """Called when the window gains or loses focus."""
+        self.focused = focused
+        self.update_detection()
+
+    def update_detection(self):
+        """Set up the hand detector for the active state and window focus."""
+        if self.detector is None:
+            return
+        if self.focused and self.state.detection_profile is not None:
+            self.detector.set_profile(self.state.detection_profile)
+            self.detector.resume()
+        else:
+            self.detector.pause()
 
     def get_event(self, event):
         """
@@ -75,6 +99,8 @@ class _State(object):
         self.next = None
         self.previous = None
         self.persist = {}
+        # How the hand detector runs while this state is active, None to pause it
+        self.detection_profile = profiles.FIGHT
 
     def get_event(self, event):
         """
@@ -1,9 +1,8 @@
 import os
-import threading
-import time
 
 import pygame as pg
 from .. import state_machine, prepare, hand_detection
+from ..detection import profiles
 from ..components.enemy.enemy import Enemy
 from ..controls import DEFAULT_CONTROLS
 
@@ -11,14 +10,10 @@ from ..controls import DEFAULT_CONTROLS
 class EnemySelect(state_machine._State):
     def __init__(self):
         super(EnemySelect, self).__init__()
+        self.detection_profile = profiles.MENU
         self.last_gesture_time = None
         self.current_gesture = None
-        self.gesture_lock = threading.Lock()
-        self.detecting = True
         self.gesture_debounce_time = .5
-        self.detection_thread = threading.Thread(target=self.run_hand_detection, daemon=True)
-        self.detection_thread.start()
-
 
         self.enemies = [
             {"name": "emoji", "health": 5, "warning_duration": 1000, "image": prepare.GFX["enemies"]["emoji"]["portrait"]},
@@ -123,36 +118,33 @@ class EnemySelect(state_machine._State):
                     rect = pg.Rect(x, y, self.grid_cell_size - 10, self.grid_cell_size - 10)
                     pg.draw.rect(surface, color, rect)
 
-    def run_hand_detection(self):
-        while self.detecting:
-            detected_gesture = hand_detection.get_detected_gesture()
-
-            # Only update current_gesture if enough time has passed since the last update
-            if detected_gesture:
-                current_time = time.time()
-                if self.last_gesture_time is None or current_time - self.last_gesture_time >= self.gesture_debounce_time:
-                    with self.gesture_lock:
-                        self.current_gesture = detected_gesture
-                        self.last_gesture_time = current_time
-
-                        if detected_gesture == "move_right":
-                            if self.play_sound:
-                                self.choose_sound.play()
-                            self.selected_index = (self.selected_index + 1) % len(self.enemies)
-                        elif detected_gesture == "move_left":
-                            if self.play_sound:
-                                self.choose_sound.play()
-                            self.selected_index = (self.selected_index - 1) % len(self.enemies)
-                        elif detected_gesture in ("punch_left", "punch_right"):
-                            if self.play_sound:
-                                self.punch_sound.play()
-                            pg.mixer.music.stop()
-                            self.next = "GAME"
-                            self.done = True
+    def handle_gesture(self, event):
+        """Browse and pick enemies with a detected gesture."""
+        # Only accept a gesture if enough time has passed since the last one
+        if self.last_gesture_time is None or event.timestamp - self.last_gesture_time >= self.gesture_debounce_time:
+            self.current_gesture = event.gesture
+            self.last_gesture_time = event.timestamp
+
+            if event.gesture == "move_right":
+                if self.play_sound:
+                    self.choose_sound.play()
+                self.selected_index = (self.selected_index + 1) % len(self.enemies)
+            elif event.gesture == "move_left":
+                if self.play_sound:
+                    self.choose_sound.play()
+                self.selected_index = (self.selected_index - 1) % len(self.enemies)
+            elif event.gesture in ("punch_left", "punch_right"):
+                if self.play_sound:
+                    self.punch_sound.play()
+                pg.mixer.music.stop()
+                self.next = "GAME"
+                self.done = True
 
     def get_event(self, event):
-        """Handle keyboard input for enemy selection."""
-        if event.type == pg.KEYDOWN:
+        """Handle keyboard and gesture input for enemy selection."""
+        if event.type == hand_detection.GESTURE:
+            self.handle_gesture(event)
+        elif event.type == pg.KEYDOWN:
             if event.key == DEFAULT_CONTROLS["move_left"]:
                 if self.play_sound:
                     self.choose_sound.play()
@@ -209,7 +201,6 @@ class EnemySelect(state_machine._State):
 
     def cleanup(self):
         """Store selected enemy data in the persistent dictionary."""
-        self.detecting = False
         self.play_sound = False
         self.persist["selected_enemy"] = self.enemies[self.selected_index]
         return self.persist
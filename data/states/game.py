@@ -1,5 +1,6 @@
 import pygame as pg
 from .. import state_machine, prepare
+from ..detection import profiles
 from ..animation_manager import AnimationManager
 from ..components.enemy_health_drawer import draw_enemy_health
 from ..components.player_health_drawer import draw_player_health
@@ -12,6 +13,7 @@ from ..components.countdown import Countdown
 class Game(state_machine._State):
     def __init__(self):
         super(Game, self).__init__()
+        self.detection_profile = profiles.FIGHT
         self.enemy = Enemy()
         self.animation_manager = AnimationManager()
         self.control_manager = ControlManager()
@@ -133,6 +135,11 @@ class Game(state_machine._State):
             elif self.enemy.health <= 0:
                 self.victory()
 
+    def get_event(self, event):
+        """Hand gestures to the player once the fight has started."""
+        if not self.countdown_active:
+            self.player.get_event(event)
+
     def draw(self, surface, interpolate):
         """Render the game visuals."""
 
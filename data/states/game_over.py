@@ -19,6 +19,7 @@ OPTION_SPACER = 80
 class GameOver(state_machine._State):
     def __init__(self):
         state_machine._State.__init__(self)
+        self.detection_profile = None  # Keyboard only, no need for the camera
         self.control_manager = ControlManager()
         self.index = 0
         self.options = self.make_options(FONT, OPTIONS, OPTION_SPACER)
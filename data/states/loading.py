@@ -12,6 +12,7 @@ class LoadingScreen(state_machine._State):
     """
     def __init__(self):
         state_machine._State.__init__(self)
+        self.detection_profile = None  # Keyboard only, no need for the camera
         self.load_duration = 1000  # Time in milliseconds to display the loading screen
         self.next_state = None
 
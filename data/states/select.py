@@ -6,11 +6,10 @@ This screen allows users to select between:
     * Exit (Quit Game)
 """
 import sys
-import threading
-import time
 
 import pygame as pg
 from .. import prepare, state_machine, tools, hand_detection
+from ..detection import profiles
 from ..controls import ControlManager
 
 FONT = pg.font.Font(prepare.FONTS["Fixedsys500c"], 34)
@@ -39,14 +38,10 @@ class MainMenu(state_machine._State):
         self.is_focused = True
         self.last_gesture_time = None
         self.current_gesture = None
-        self.gesture_lock = threading.Lock()
-        self.detecting = True
         self.gesture_debounce_time = .5
-        self.detection_thread = threading.Thread(target=self.run_hand_detection, daemon=True)
-        self.detection_thread.start()
-        
-        
+
         state_machine._State.__init__(self)
+        self.detection_profile = profiles.MENU
         self.ground = prepare.GFX["misc"]["title_screen"]
         self.image = prepare.GFX["backgrounds"]["ring1"]
         self.index = 0
@@ -133,40 +128,38 @@ class MainMenu(state_machine._State):
 
             surface.blit(msg, rect)
             
-    def run_hand_detection(self):
-        if self.is_focused:
-            while self.detecting:
-                detected_gesture = hand_detection.get_detected_gesture()
-
-
-                # Only update current_gesture if enough time has passed since the last update
-                if detected_gesture:
-                    current_time = time.time()
-                    if self.last_gesture_time is None or current_time - self.last_gesture_time >= self.gesture_debounce_time:
-                        with self.gesture_lock:
-                            self.current_gesture = detected_gesture
-                            self.last_gesture_time = current_time
-
-                            if detected_gesture == "move_right":
-                                self.index = (self.index + 1) % len(OPTIONS)
-                                if self.play_sound:
-                                    self.choose_sound.play()
-                                if self.index == 0:
-                                    self.index = (self.index + 1) % len(OPTIONS)
-                            elif detected_gesture == "move_left":
-                                if self.play_sound:
-                                    self.choose_sound.play()
-                                self.index = (self.index - 1) % len(OPTIONS)
-                                if self.index == 0:
-                                    self.index = (self.index - 1) % len(OPTIONS)
-                            elif detected_gesture in ("punch_left", "punch_right"):
-                                if self.play_sound:
-                                    self.punch_sound.play()
-                                self.pressed_enter()
+    def handle_gesture(self, event):
+        """Navigate the menu with a detected gesture."""
+        if not self.is_focused:
+            return
+
+        # Only accept a gesture if enough time has passed since the last one
+        if self.last_gesture_time is None or event.timestamp - self.last_gesture_time >= self.gesture_debounce_time:
+            self.current_gesture = event.gesture
+            self.last_gesture_time = event.timestamp
+
+            if event.gesture == "move_right":
+                self.index = (self.index + 1) % len(OPTIONS)
+                if self.play_sound:
+                    self.choose_sound.play()
+                if self.index == 0:
+                    self.index = (self.index + 1) % len(OPTIONS)
+            elif event.gesture == "move_left":
+                if self.play_sound:
+                    self.choose_sound.play()
+                self.index = (self.index - 1) % len(OPTIONS)
+                if self.index == 0:
+                    self.index = (self.index - 1) % len(OPTIONS)
+            elif event.gesture in ("punch_left", "punch_right"):
+                if self.play_sound:
+                    self.punch_sound.play()
+                self.pressed_enter()
 
     def get_event(self, event):
         """Handle key events using ControlManager."""
-        if event.type == pg.KEYDOWN or event.type == pg.KEYUP:
+        if event.type == hand_detection.GESTURE:
+            self.handle_gesture(event)
+        elif event.type == pg.KEYDOWN or event.type == pg.KEYUP:
             action = self.control_manager.handle_key_event(event)
 
             if event.type == pg.KEYDOWN:
@@ -1,7 +1,6 @@
-import threading
-import time
 import pygame as pg
 from .. import prepare, state_machine, hand_detection
+from ..detection import profiles
 from ..components.player.player_template import Player
 
 LOADING_BAR_COLOR = (255, 0, 0)  # Red color for the loading bar
@@ -10,15 +9,17 @@ LOADING_BAR_BG_COLOR = (100, 100, 100)
 class Splash(state_machine._State):
     def __init__(self):
         state_machine._State.__init__(self)
+        self.detection_profile = profiles.IDLE  # Any gesture will do
         self.next = "TITLE"
 
-        self.load_duration = 1000  # Time for loading process (in milliseconds)
-
         # Loading bar dimensions and positions
         self.bar_width = 1000
         self.bar_height = 30
         self.bar_position = (prepare.SCREEN_RECT.centerx - self.bar_width // 2, prepare.SCREEN_RECT.centery + 350)  # Position it below the animation
-        self.bar_progress = 0  # To track progress
+        self.bar_progress = 0  # Warm-up progress of the hand detector, from 0 to 1
+        self.detector_ready = False
+        self.detector_error = None  # Why the hand detector failed to start, the game goes on with the keyboard
+        self.camera_healthy = True  # False while the frame source is failing or lost, the keyboard works then too
 
         # Initialize the player sprite to display idle animation
         self.player_surface = pg.Surface(prepare.SCREEN_RECT.size, pg.SRCALPHA)  # Create a transparent surface
@@ -28,46 +29,16 @@ class Splash(state_machine._State):
 
         # Hand gesture detection
         self.current_gesture = None
-        self.gesture_lock = threading.Lock()
-        self.detecting = True
-        self.detection_thread = threading.Thread(target=self.run_hand_detection, daemon=True)
-        self.detection_thread.start()
         self.gesture_detected = False
-        self.start_time = None  # Start time for the loading process (None initially)
-        self.last_gesture_time = time.time()
-        self.gesture_debounce_time = 1  # 300 ms debounce time
-
-    def run_hand_detection(self):
-        while self.detecting:
-            detected_gesture = hand_detection.get_detected_gesture()
-
-            # Only update current_gesture if enough time has passed since the last update
-            if detected_gesture:
-                current_time = time.time()
-                with self.gesture_lock:
-                    self.current_gesture = detected_gesture
-                    self.last_gesture_time = current_time
+        self.last_gesture_time = None
 
     def update(self, keys, now):
         """Update the loading screen state."""
 
-        # Start the loading time once gesture is detected
-        with self.gesture_lock:
-            if self.current_gesture is not None:
-                # Detect the gesture once, and only if the gesture hasn't been processed yet
-                if not self.gesture_detected:
-                    self.gesture_detected = True
-                    # Initialize the start time once the gesture is detected
-                    self.start_time = pg.time.get_ticks()
-
-        # Track elapsed time only if the gesture is detected
-        if self.gesture_detected and self.start_time is not None:
-            elapsed_time = now - self.start_time
-            self.bar_progress = min(elapsed_time / self.load_duration, 1)  # Progress goes from 0 to 1
-
-            if elapsed_time > self.load_duration:
-                self.done = True
-                self.detecting = False
+        # Move on with the first gesture once the detector has warmed up
+        if self.current_gesture is not None and self.detector_ready:
+            self.gesture_detected = True
+            self.done = True
 
         # Update the player's idle animation
         self.player.update(now, keys, None)
@@ -81,14 +52,23 @@ class Splash(state_machine._State):
         self.player.draw(self.player_surface)
         surface.blit(self.player_surface, (0, 0))
 
-        # Draw the loading bar background (gray)
-        pg.draw.rect(surface, LOADING_BAR_BG_COLOR, (*self.bar_position, self.bar_width, self.bar_height))
+        if self.detector_error is None:
+            # Draw the loading bar background (gray)
+            pg.draw.rect(surface, LOADING_BAR_BG_COLOR, (*self.bar_position, self.bar_width, self.bar_height))
 
-        # Draw the loading bar progress (red)
-        current_bar_width = self.bar_width * self.bar_progress  # Width based on progress
-        pg.draw.rect(surface, LOADING_BAR_COLOR, (*self.bar_position, current_bar_width, self.bar_height))
+            # Draw the loading bar progress (red)
+            current_bar_width = self.bar_width * self.bar_progress  # Width based on progress
+            pg.draw.rect(surface, LOADING_BAR_COLOR, (*self.bar_position, current_bar_width, self.bar_height))
 
-        self.note = render_font("Fixedsys500c", 30, "Initializing Assets...", (255, 255, 255))
+        if self.detector_error is not None:
+            message = "Hand detection unavailable, press any key to start"
+        elif not self.camera_healthy:
+            message = "Camera not available, press any key to start"
+        elif self.detector_ready:
+            message = "Show your hands to start"
+        else:
+            message = "Initializing Hand Detection..."
+        self.note = render_font("Fixedsys500c", 30, message, (255, 255, 255))
 
         # Calculate the position of the note below the player
         center_x = prepare.SCREEN_RECT.centerx
@@ -99,8 +79,22 @@ class Splash(state_machine._State):
         # Draw the note on the screen
         surface.blit(self.note, self.rect)
 
+        if self.detector_error is not None:
+            error = render_font("Fixedsys500c", 20, self.detector_error, (255, 120, 120))
+            surface.blit(error, error.get_rect(midtop=(center_x, self.rect.bottom + 10)))
+
     def get_event(self, event):
-        pass
+        if event.type == hand_detection.GESTURE:
+            self.current_gesture = event.gesture
+            self.last_gesture_time = event.timestamp
+        elif event.type == hand_detection.DETECTOR_READINESS:
+            self.bar_progress = min(event.progress, 1)
+            self.detector_ready = event.ready
+            self.detector_error = event.error
+        elif event.type == hand_detection.DETECTOR_HEALTH:
+            self.camera_healthy = event.healthy
+        elif event.type == pg.KEYDOWN and (self.detector_error is not None or not self.camera_healthy):
+            self.done = True
 
 
 def render_font(font, size, msg, color=(255, 255, 255)):
@@ -1,11 +1,9 @@
 """
 State for the Title scene.
 """
-import threading
-import time
-
 import pygame as pg
 from .. import prepare, state_machine, tools, hand_detection
+from ..detection import profiles
 from ..controls import DEFAULT_CONTROLS
 from ..tools import Timer
 
@@ -18,15 +16,12 @@ class Title(state_machine._State):
 
     def __init__(self):
         super().__init__()
-        self.detecting = True  # Control detection thread
-        self.gesture_lock = threading.Lock()
-        self.detection_thread = threading.Thread(target=self.run_hand_detection, daemon=True)
         self.last_gesture_time = None  # Time of last detected gesture
         self.gesture_debounce_time = 1
-        self.detection_thread.start()
         self.current_gesture = None
 
         state_machine._State.__init__(self)
+        self.detection_profile = profiles.MENU
 
         self.ground = prepare.GFX["misc"]["title_screen"]
         self.elements = self.make_elements()
@@ -134,27 +129,22 @@ class Title(state_machine._State):
         # Update elements like blinking "Punch to start"
         self.elements.update(now)
 
-    def run_hand_detection(self):
-        while self.detecting:
-            detected_gesture = hand_detection.get_detected_gesture()
-
-            # Only update current_gesture if enough time has passed since the last update
-            if detected_gesture:
-                current_time = time.time()
-                if self.last_gesture_time is None or current_time - self.last_gesture_time >= self.gesture_debounce_time:
-                    with self.gesture_lock:
-                        self.current_gesture = detected_gesture
-                        self.last_gesture_time = current_time
-
-                        if detected_gesture in ("punch_left", "punch_right"):
-                            self.punch_sound.play()
+    def handle_gesture(self, event):
+        """Start the game when a punch gesture is detected."""
+        # Only accept a gesture if enough time has passed since the last one
+        if self.last_gesture_time is None or event.timestamp - self.last_gesture_time >= self.gesture_debounce_time:
+            self.current_gesture = event.gesture
+            self.last_gesture_time = event.timestamp
 
-                            self.detecting = False
-                            self.done = True
-                            self.next = "SELECT"
+            if event.gesture in ("punch_left", "punch_right"):
+                self.punch_sound.play()
+                self.done = True
+                self.next = "SELECT"
 
     def get_event(self, event):
-        if event.type == pg.KEYDOWN:
+        if event.type == hand_detection.GESTURE:
+            self.handle_gesture(event)
+        elif event.type == pg.KEYDOWN:
             if event.key == DEFAULT_CONTROLS["punch_left"] or event.key == DEFAULT_CONTROLS["punch_right"]:
                 self.punch_sound.play()
                 self.done = True
@@ -20,6 +20,7 @@ OPTION_SPACER = 80
 class Victory(state_machine._State):
     def __init__(self):
         state_machine._State.__init__(self)
+        self.detection_profile = None  # Keyboard only, no need for the camera
         self.selected_enemy = None
         self.control_manager = ControlManager()
         self.index = 0
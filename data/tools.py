@@ -10,18 +10,27 @@ from .controls import ControlManager
 
 TIME_PER_UPDATE = 16.0  # Milliseconds
 
+# What the camera indicator says when the detector's frame source is unhealthy
+HEALTH_MESSAGES = {
+    "failing": ("Camera not responding", (255, 200, 0)),
+    "lost": ("Camera lost, reconnecting...", (255, 60, 60)),
+}
+
 
 class Control:
-    def __init__(self, caption):
+    def __init__(self, caption, detector=None):
         self.screen = pg.display.get_surface()
         self.caption = caption
         self.done = False
         self.clock = pg.time.Clock()
         self.fps = 60.0
         self.fps_visible = True
+        self.latency_visible = False
+        self.latency_font = None
         self.now = 0.0
         self.keys = pg.key.get_pressed()
-        self.state_machine = state_machine.StateMachine()
+        self.detector = detector
+        self.state_machine = state_machine.StateMachine(detector)
         self.control_manager = ControlManager()  # Initialize ControlManager
 
     def update(self):
@@ -32,6 +41,8 @@ class Control:
     def draw(self, interpolate):
         if not self.state_machine.state.done:
             self.state_machine.draw(self.screen, interpolate)
+            self.show_latency()
+            self.show_detector_health()
             pg.display.update()
             self.show_fps()
 
@@ -45,8 +56,13 @@ class Control:
                 self.keys = pg.key.get_pressed()
                 self.control_manager.handle_key_event(event)
                 self.toggle_show_fps(event.key)
+                self.toggle_show_latency(event.key)
             elif event.type == pg.KEYUP:
                 self.keys = pg.key.get_pressed()
+            elif event.type == pg.WINDOWFOCUSLOST:
+                self.state_machine.set_focus(False)
+            elif event.type == pg.WINDOWFOCUSGAINED:
+                self.state_machine.set_focus(True)
             self.state_machine.get_event(event)
 
     def toggle_show_fps(self, key):
@@ -63,6 +79,43 @@ class Control:
             with_fps = "{} - {:.2f} FPS".format(self.caption, fps)
             pg.display.set_caption(with_fps)
 
+    def toggle_show_latency(self, key):
+        """
+        Press f3 to turn on/off the gesture latency overlay, f4 to write the
+        latency percentiles to REBOX_LATENCY_DUMP (latency.json by default).
+        """
+        if self.detector is None:
+            return
+        if key == pg.K_F3:
+            self.latency_visible = not self.latency_visible
+        elif key == pg.K_F4:
+            self.detector.latency.dump(os.environ.get("REBOX_LATENCY_DUMP") or "latency.json")
+
+    def show_latency(self):
+        """Draw the p50/p95/p99 gesture latency of every stage and the dropped frames in the top left corner."""
+        if not self.latency_visible:
+            return
+        if self.latency_font is None:
+            self.latency_font = pg.font.SysFont("monospace", 14)
+        lines = self.detector.latency.summary()
+        if not self.detector.latency.count:
+            lines.insert(0, "no gestures consumed yet")
+        for i, line in enumerate(lines):
+            text = self.latency_font.render(line, True, (255, 255, 0), (0, 0, 0))
+            self.screen.blit(text, (5, 5 + i * text.get_height()))
+
+    def show_detector_health(self):
+        """Draw a warning in the top right corner while the camera is failing or being reconnected."""
+        if self.detector is None or self.detector.health not in HEALTH_MESSAGES:
+            return
+        if self.latency_font is None:
+            self.latency_font = pg.font.SysFont("monospace", 14)
+        message, color = HEALTH_MESSAGES[self.detector.health]
+        text = self.latency_font.render(message, True, color, (0, 0, 0))
+        rect = text.get_rect(topright=(self.screen.get_width() - 5, 5))
+        pg.draw.circle(self.screen, color, (rect.left - 10, rect.centery), 5)
+        self.screen.blit(text, rect)
+
     def main(self):
         """Main loop for the entire program. Uses a constant timestep."""
         lag = 0.0
@@ -73,6 +126,8 @@ class Control:
                 self.update()
                 lag -= TIME_PER_UPDATE
             self.draw(lag / TIME_PER_UPDATE)
+        if self.detector is not None:
+            self.detector.stop()
 
 
 class Timer:
@@ -8,10 +8,12 @@ MADE WITH PASSION
 import sys
 import pygame as pg
 
-from data.main import main
-
 
 if __name__ == '__main__':
+    # Imported here so the hand detection worker process, which re-imports
+    # this file, doesn't open a window of its own.
+    from data.main import main
+
     main()
     pg.quit()
     sys.exit()
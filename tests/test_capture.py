@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+import pytest
+
+from data.detection.capture import HEALTH_FAILING, HEALTH_LOST, HEALTH_OK, CaptureSupervisor, FrameGrabber
+
+
+class CountingCapture:
+    """Frames filled with their number, as fast as they are read or at a fixed rate."""
+    def __init__(self, shape=(4, 4, 3), interval=0.0):
+        self.shape = shape
+        self.interval = interval
+        self.count = 0
+
+    def read(self, out=None):
+        if self.interval:
+            time.sleep(self.interval)
+        self.count += 1
+        frame = out if out is not None else np.empty(self.shape, dtype=np.uint8)
+        frame.fill(self.count % 256)
+        return True, frame
+
+    def release(self):
+        pass
+
+
+@pytest.mark.parametrize("size", [3, 4, 5])
+def test_free_slot_never_hands_out_the_newest_or_the_lent_frame(size):
+    grabber = FrameGrabber(CountingCapture(), size=size)
+    for newest in range(-1, size):
+        for reading in range(-1, size):
+            grabber.newest, grabber.reading = newest, reading
+            slot = grabber.free_slot()
+            assert 0 <= slot < size
+            assert slot != newest and slot != reading
+
+
+def test_needs_three_slots():
+    with pytest.raises(ValueError):
+        FrameGrabber(CountingCapture(), size=2)
+
+
+def test_latest_returns_the_newest_frame_and_counts_drops():
+    grabber = FrameGrabber(CountingCapture())
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    grabber.store(frame, 1.0)
+    for n in range(2, 6):
+        slot = grabber.free_slot()
+        grabber.slots[slot].fill(n)
+        grabber.publish(slot, float(n))
+    latest, timestamp = grabber.latest(timeout=0)
+    assert timestamp == 5.0 and latest[0, 0, 0] == 5
+    assert grabber.dropped == 4
+    # Nothing newer yet
+    assert grabber.latest(timeout=0) == (None, None)
+
+
+def test_lent_frame_is_not_overwritten_while_capturing():
+    grabber = FrameGrabber(CountingCapture(interval=0.001))
+    grabber.start()
+    thread = grabber.thread
+    try:
+        for _ in range(50):
+            frame, _ = grabber.latest(timeout=1)
+            value = frame[0, 0, 0]
+            time.sleep(0.005)  # Several frames are captured meanwhile
+            assert (frame == value).all()
+    finally:
+        grabber.stop()
+    assert not thread.is_alive()
+
+
+def test_a_few_failed_reads_go_unreported():
+    reported = []
+    supervisor = CaptureSupervisor(failing_after=3, on_health=reported.append)
+    for _ in range(5):
+        supervisor.failed()
+        supervisor.failed()
+        supervisor.succeeded()
+    assert reported == []
+    for _ in range(3):
+        supervisor.failed()
+    assert reported == [HEALTH_FAILING]
+
+
+def test_health_goes_from_failing_to_lost_and_back():
+    reported = []
+    supervisor = CaptureSupervisor(max_failures=5, failing_after=2, initial_delay=0.25, on_health=reported.append)
+    delays = [supervisor.failed() for _ in range(7)]
+    assert delays[:4] == [(supervisor.retry_delay, False)] * 4
+    assert delays[4:] == [(0.25, True), (0.5, True), (1.0, True)]
+    supervisor.succeeded()
+    assert reported == [HEALTH_FAILING, HEALTH_LOST, HEALTH_OK]
+    assert supervisor.delay == 0.25
@@ -0,0 +1,79 @@
+import numpy as np
+
+from data.detection.classifier import GestureClassifier
+from data.detection.landmarks import NUM_LANDMARKS, LandmarkFrame
+from data.detection.punches import PUNCH_GESTURES
+
+W, H = 640, 480
+FPS = 30
+
+
+def hand(center_x, center_y, side):
+    """Normalized landmarks of a hand whose box is a square of side pixels."""
+    angles = np.linspace(0, 2 * np.pi, NUM_LANDMARKS, endpoint=False)
+    x = center_x + side / 2 * np.clip(1.5 * np.cos(angles), -1, 1)
+    y = center_y + side / 2 * np.clip(1.5 * np.sin(angles), -1, 1)
+    return np.stack((x / W, y / H, np.zeros(NUM_LANDMARKS)), axis=1)
+
+
+def frame(n, left_side=None, right_side=None):
+    """Frame n with the left hand in the left half and the right hand in the right half, if given."""
+    hands = [(i, hand(x, 240, side)) for i, (x, side) in enumerate(((160, left_side), (480, right_side)))
+             if side is not None]
+    points = np.array([points for _, points in hands], dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+    return LandmarkFrame(points, np.array([i for i, _ in hands], dtype=np.intp), n / FPS)
+
+
+def punches(classifier, frames):
+    return [g for landmarks in frames for g in classifier.classify(landmarks, W, H) if g.startswith("punch")]
+
+
+# The left hand swings at the camera, its box growing 30 pixels a side per frame
+SWING = [100 + 30 * n for n in range(12)]
+
+
+def test_a_hand_punches_with_the_other_one_in_view():
+    classifier = GestureClassifier()
+    frames = [frame(n, 100, 100) for n in range(10)]
+    frames += [frame(10 + n, side, 100) for n, side in enumerate(SWING)]
+    assert punches(classifier, frames) == [PUNCH_GESTURES[0]]
+
+
+def test_a_hand_still_punches_once_the_other_one_is_lost():
+    classifier = GestureClassifier()
+    frames = [frame(n, 100, 100) for n in range(10)]
+    # The right hand leaves the camera for good
+    frames += [frame(10 + n, 100) for n in range(5)]
+    frames += [frame(15 + n, side) for n, side in enumerate(SWING)]
+    assert punches(classifier, frames) == [PUNCH_GESTURES[0]]
+
+
+def test_a_hand_found_again_waits_for_a_full_window():
+    classifier = GestureClassifier()
+    # Straight into a swing, too soon to tell
+    assert punches(classifier, [frame(n, side) for n, side in enumerate(SWING[:4])]) == []
+
+
+def punch_times(classifier, frames):
+    times = {gesture: [] for gesture in PUNCH_GESTURES}
+    for landmarks in frames:
+        for gesture in classifier.classify(landmarks, W, H):
+            if gesture in times:
+                times[gesture].append(landmarks.timestamp)
+    return [np.array(times[gesture]) for gesture in PUNCH_GESTURES]
+
+
+def test_cooldowns_are_per_hand():
+    # Both hands keep swinging
+    sides = (SWING + [100] * 3) * 4
+    frames = [frame(n, 100, 100) for n in range(10)]
+    frames += [frame(10 + n, side, side) for n, side in enumerate(sides)]
+    left, right = punch_times(GestureClassifier(cooldowns=(1.0, 0.25)), frames)
+    assert np.diff(left).min() >= 1.0 - 1e-9
+    assert np.diff(right).min() >= 0.25 - 1e-9
+    assert len(right) > len(left) >= 2
+
+
+def test_default_cooldown_is_a_second():
+    classifier = GestureClassifier()
+    assert classifier.cooldown_ns == {"left": 1_000_000_000, "right": 1_000_000_000}
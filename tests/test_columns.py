@@ -0,0 +1,48 @@
+import numpy as np
+
+from data.detection.columns import ColumnTracker
+from data.detection.history import HandHistory
+
+W = 600  # Columns end at 200 and 400, the band is 24 pixels
+
+
+def track(xs, tracker=None, fps=30):
+    """Feed one hand moving through xs to a tracker. Returns its column after every frame."""
+    tracker = tracker if tracker is not None else ColumnTracker()
+    history = HandHistory()
+    histories = [history, HandHistory()]
+    columns = []
+    for n, x in enumerate(xs):
+        center = np.array([[x, 240.0]])
+        history.push(n / fps, center[0], 1000)
+        tracker.update(np.array([0]), center, histories, W)
+        columns.append(int(tracker.columns[0]))
+    return columns
+
+
+def test_resting_on_a_boundary_does_not_flap():
+    rng = np.random.default_rng(0)
+    xs = 200 + rng.uniform(-20, 20, 100)
+    assert set(track(xs, ColumnTracker(lookahead=0))) == {1}
+
+
+def test_crossing_the_band_changes_column():
+    columns = track([300, 250, 230, 210, 190, 170, 150], ColumnTracker(lookahead=0))
+    assert columns[-1] == 0
+    # Still inside the band just past the boundary
+    assert columns[columns.index(0) - 1] == 1
+    assert track([300, 350, 380, 430, 440], ColumnTracker(lookahead=0))[-1] == 2
+
+
+def test_coming_back_needs_the_band_too():
+    columns = track([300, 170, 170, 190, 210, 215, 230, 230], ColumnTracker(lookahead=0))
+    assert columns[:6] == [1, 0, 0, 0, 0, 0]
+    assert columns[-1] == 1
+
+
+def test_fast_hands_change_column_before_crossing():
+    # 30 pixels a frame is 900 pixels a second, above min_speed
+    xs = [300, 270, 240, 210]
+    assert track(xs)[-1] == 0
+    slow = ColumnTracker(lookahead=0)
+    assert track(xs, slow)[-1] == 1
@@ -0,0 +1,49 @@
+import numpy as np
+
+from data.detection import profiles
+from data.detection.landmarks import LandmarkFrame
+from data.detection.pipeline import DetectionPipeline
+
+
+class FakeBackend:
+    """Finds nothing, keeps the images it was given."""
+    color_order = "BGR"
+
+    def __init__(self):
+        self.images = []
+        self.inferred_at = None
+
+    def detect(self, image, captured_at):
+        self.images.append(image.shape)
+        return LandmarkFrame.empty(captured_at)
+
+    def close(self):
+        pass
+
+
+def test_small_crops_are_upsampled_to_the_input_size():
+    pipeline = DetectionPipeline(FakeBackend(), roi=True)
+    pipeline.apply_profile(profiles.FIGHT)
+    assert pipeline.roi_size(200, 150) == (640, 480)
+    assert pipeline.roi_size(320, 240) == (640, 480)
+
+
+def test_large_crops_are_never_shrunk():
+    pipeline = DetectionPipeline(FakeBackend(), roi=True)
+    pipeline.apply_profile(profiles.FIGHT)
+    assert pipeline.roi_size(800, 600) == (800, 600)
+    pipeline.apply_profile(profiles.MENU)
+    assert pipeline.roi_size(400, 300) == (400, 300)
+    assert pipeline.roi_size(160, 120) == (320, 240)
+
+
+def test_the_backend_gets_the_crop_at_roi_size():
+    backend = FakeBackend()
+    pipeline = DetectionPipeline(backend, roi=True)
+    pipeline.apply_profile(profiles.MENU)
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    for box in ((20, 10, 620, 460), (100, 100, 260, 220)):
+        pipeline.roi.box = box
+        pipeline.roi.frames_since_refresh = 0
+        pipeline.process(frame, 1.0)
+    assert backend.images == [(450, 600, 3), (240, 320, 3)]
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from data.detection.landmarks import NUM_LANDMARKS
+from data.detection.punches import (AreaSlopePunchDetector, VelocityPunchDetector, fit_logistic, hand_features,
+                                    make_punch_detector)
+
+
+def test_slope_stays_the_default():
+    detector = make_punch_detector()
+    assert isinstance(detector, AreaSlopePunchDetector)
+    assert detector.threshold == 600 and detector.slopes[0].window == 5
+
+
+def test_make_punch_detector_parses_specs():
+    detector = make_punch_detector("slope:window=4,threshold=300")
+    assert detector.threshold == 300 and detector.slopes[0].window == 4
+    assert isinstance(make_punch_detector("velocity"), VelocityPunchDetector)
+    with pytest.raises(ValueError):
+        make_punch_detector("area")
+
+
+W, H = 640, 480
+FPS = 30
+# A fixed hand shape, in units of its size, with a little depth
+TEMPLATE = np.random.default_rng(1).uniform(-0.5, 0.5, (NUM_LANDMARKS, 3))
+
+
+def hand(size, center=(320, 240)):
+    """Normalized landmarks of the template hand size pixels across."""
+    points = TEMPLATE * size
+    points[:, 0] = (points[:, 0] + center[0]) / W
+    points[:, 1] = (points[:, 1] + center[1]) / H
+    points[:, 2] /= W
+    return points[None].astype(np.float32)
+
+
+def scores(detector, sizes):
+    """Score of the left hand after every frame of it at sizes."""
+    hand_index = np.array([0])
+    out = []
+    for n, size in enumerate(sizes):
+        detector.update(hand_index, hand(size), None, n / FPS, W, H)
+        out.append(detector.scores[0])
+    return np.array(out)
+
+
+def test_features_dont_depend_on_scale():
+    small, large = hand_features(hand(100), W, H), hand_features(hand(200), W, H)
+    np.testing.assert_allclose(large - small, [[np.log(4), np.log(2), 0]], atol=0.02)
+
+
+def test_a_growing_hand_scores_positive():
+    # 20% bigger every frame
+    growing = scores(VelocityPunchDetector(), 100 * 1.2 ** np.arange(6))
+    assert (growing[2:] > 0).all()
+
+
+def test_a_still_hand_scores_negative():
+    still = scores(VelocityPunchDetector(), [150] * 6)
+    assert (still[2:] < 0).all()
+
+
+def test_a_hand_is_unready_until_its_window_is_full():
+    detector = VelocityPunchDetector(window=4)
+    growing = scores(detector, 100 * 1.5 ** np.arange(4))
+    assert np.isneginf(growing[:3]).all() and growing[3] > 0
+    detector.reset(0)
+    assert np.isneginf(scores(detector, [100, 150])).all()
+
+
+def test_hands_are_judged_separately():
+    detector = VelocityPunchDetector()
+    for n in range(4):
+        points = np.concatenate((hand(100 * 1.2 ** n, (160, 240)), hand(100, (480, 240))))
+        punching = detector.update(np.array([0, 1]), points, None, n / FPS, W, H)
+    assert punching.tolist() == [True, False]
+
+
+def test_fit_logistic_separates_separable_data():
+    rng = np.random.default_rng(0)
+    features = rng.normal(0, 1, (400, 3)) * (1, 10, 0.1) + (0, 5, 0)
+    labels = (features @ (2, -0.3, 10) + 1.5 > 0).astype(float)
+    weights, bias = fit_logistic(features, labels)
+    predicted = features @ weights + bias > 0
+    assert (predicted == labels.astype(bool)).mean() >= 0.98
+    assert labels.mean() > 0.1 and labels.mean() < 0.9
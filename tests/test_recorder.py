@@ -0,0 +1,57 @@
+import numpy as np
+
+from data.detection.landmarks import NUM_LANDMARKS, LandmarkFrame
+from data.detection.recorder import LandmarkRecorder, load_recording
+
+
+def make_frames(count, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for n in range(count):
+        hands = n % 3
+        points = rng.random((hands, NUM_LANDMARKS, 3), dtype=np.float32)
+        frames.append(LandmarkFrame(points, np.arange(hands, dtype=np.intp) % 2, n / 30))
+    return frames
+
+
+def assert_same_frames(loaded, frames):
+    assert len(loaded) == len(frames)
+    for a, b in zip(loaded, frames):
+        np.testing.assert_array_equal(a.points, b.points)
+        np.testing.assert_array_equal(a.hand_index, b.hand_index)
+        assert a.timestamp == b.timestamp
+
+
+def test_frames_are_written_in_chunks_and_read_back_in_order(tmp_path):
+    path = tmp_path / "session.npz"
+    frames = make_frames(25)
+    recorder = LandmarkRecorder(path, chunk_frames=10)
+    for landmarks in frames:
+        recorder.record(landmarks, 640, 480)
+    # Two full chunks are on disk already, the rest only in memory
+    assert recorder.chunks == 2 and len(recorder.timestamps) == 5
+    assert_same_frames(load_recording(path)[0], frames[:20])
+
+    recorder.save()
+    loaded, frame_size = load_recording(path)
+    assert_same_frames(loaded, frames)
+    assert frame_size == (640, 480)
+    assert len(recorder) == 25
+
+
+def test_empty_recording_still_saves(tmp_path):
+    path = tmp_path / "empty"
+    LandmarkRecorder(path).save()
+    assert load_recording(tmp_path / "empty.npz") == ([], (0, 0))
+
+
+def test_recordings_without_chunks_still_load(tmp_path):
+    path = tmp_path / "old.npz"
+    frames = make_frames(4)
+    np.savez_compressed(path, points=np.concatenate([f.points for f in frames]),
+                        hand_index=np.concatenate([f.hand_index for f in frames]),
+                        offsets=np.array([0, 0, 1, 3, 3]), timestamps=[f.timestamp for f in frames],
+                        frame_size=np.array((320, 240)))
+    loaded, frame_size = load_recording(path)
+    assert_same_frames(loaded, frames)
+    assert frame_size == (320, 240)
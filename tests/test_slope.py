@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from data.detection.slope import RollingSlope
+
+
+def least_squares_slope(samples):
+    return np.polyfit(np.arange(len(samples)), samples, 1)[0]
+
+
+@pytest.mark.parametrize("window", [2, 5, 8])
+def test_slope_matches_least_squares_over_many_wraps(window):
+    rng = np.random.default_rng(window)
+    samples = np.cumsum(rng.normal(0, 500, 200)) + 10000
+    slope = RollingSlope(window)
+    for n, y in enumerate(samples):
+        slope.push(y)
+        if n + 1 < window:
+            assert not slope.ready
+            assert slope.slope == 0.0
+        else:
+            assert slope.ready
+            assert slope.slope == pytest.approx(least_squares_slope(samples[n + 1 - window:n + 1]), abs=1e-6)
+
+
+def test_reset_starts_the_window_over():
+    slope = RollingSlope(3)
+    for y in (5, 50, 500, 5000):
+        slope.push(y)
+    slope.reset()
+    assert not slope.ready
+    for y in (1, 2, 3):
+        slope.push(y)
+    assert slope.slope == pytest.approx(1)
+
+
+def test_window_must_hold_two_samples():
+    with pytest.raises(ValueError):
+        RollingSlope(1)
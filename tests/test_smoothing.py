@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from data.detection.smoothing import ExponentialSmoother, KalmanSmoother, OneEuroFilter, make_smoother
+
+BOX = np.array([[100.0, 120.0, 200.0, 260.0]])
+MOVED = BOX + 80
+
+
+def smooth(smoother, boxes, fps=30):
+    hand_index = np.array([0])
+    smoother.reset(0, boxes[0][0], 0.0)
+    return np.array([smoother.update(hand_index, box, (n + 1) / fps).copy() for n, box in enumerate(boxes)])
+
+
+@pytest.mark.parametrize("smoother", [ExponentialSmoother(), OneEuroFilter(), KalmanSmoother()])
+def test_a_still_box_stays_put(smoother):
+    out = smooth(smoother, [BOX] * 30)
+    np.testing.assert_allclose(out[-1], BOX, atol=1e-9)
+
+
+@pytest.mark.parametrize("smoother", [ExponentialSmoother(), OneEuroFilter(), KalmanSmoother()])
+def test_smoothed_box_follows_a_step_without_overshooting_much(smoother):
+    out = smooth(smoother, [BOX] + [MOVED] * 90)
+    np.testing.assert_allclose(out[-1], MOVED, atol=0.5)
+    assert out[:, 0, 0].max() <= MOVED[0, 0] + 10
+
+
+def test_hands_are_smoothed_independently():
+    smoother = ExponentialSmoother(alpha=0.5)
+    smoother.reset(0, BOX[0], 0.0)
+    smoother.reset(1, MOVED[0], 0.0)
+    smoother.update(np.array([0]), MOVED, 1 / 30)
+    np.testing.assert_allclose(smoother.boxes[1], MOVED[0])
+
+
+def test_one_euro_lags_less_when_fast():
+    ramp = [BOX + 20 * n for n in range(30)]
+    lazy = smooth(OneEuroFilter(beta=0), ramp)
+    eager = smooth(OneEuroFilter(beta=0.05), ramp)
+    assert abs(eager[-1, 0, 0] - ramp[-1][0, 0]) < abs(lazy[-1, 0, 0] - ramp[-1][0, 0])
+
+
+def test_make_smoother_parses_specs():
+    smoother = make_smoother("one-euro:min_cutoff=0.5/2,beta=0.02")
+    assert isinstance(smoother, OneEuroFilter)
+    np.testing.assert_allclose(smoother.min_cutoff, [0.5, 2, 0.5, 2])
+    np.testing.assert_allclose(smoother.beta, 0.02)
+    assert isinstance(make_smoother(), ExponentialSmoother)
+    with pytest.raises(ValueError):
+        make_smoother("median")